@@ -1,21 +1,16 @@
 from ast import List
+import os
+import sys
 from cnf import CNF
 from solver import ComplexSatSolver
 import argparse
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'sat-solver'))
+from dimacs import read_dimacs
+
 def parse_dimacs_cnf(filename):
-    clauses = []
-    with open(filename, 'r') as file:
-        lines = file.readlines()
-        for line in lines:
-            if line.startswith('c'):
-                continue
-            if line.startswith('p'):
-                n_vars, n_clauses = map(int, line.split()[2:4])
-            else:
-                clause = list(map(int, line.split()))[:-1]
-                clauses.append(clause)
-    return n_vars, n_clauses, clauses
+    dimacs_formula = read_dimacs(filename)
+    return dimacs_formula.num_variables, dimacs_formula.num_clauses, list(dimacs_formula.clauses())
 
 def complexSolverClauses(n_vars, clauses):
     complex_clauses = set() # set of tuples of (var, val)
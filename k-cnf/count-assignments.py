@@ -1,69 +1,33 @@
 import argparse
-import itertools
-import random
 from math import ceil
 import os
-from pycryptosat import Solver
+import sys
 import matplotlib.pyplot as plt
 import numpy as np
 import time
+from generator import random_formulas
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'sat-solver'))
+from counting import count_models
 
 class FormulaGenerator:
 
-    def __init__(self, k, r, n) -> None:
-        self.clause_types = list(itertools.product((-1, 1), repeat=k))
+    def __init__(self, k, r, n, rng=None) -> None:
         self.n = n
         self.r = r
         self.k = k
-        self.solver = Solver()
-    
-    # Generate a random clause
-    def __getRandomClause(self):
-        variables = random.sample(range(1, self.n+1), self.k)
-        clause_type = random.choice(self.clause_types)
-        clause = [a*b for a,b in zip(variables,clause_type)]
-        return clause
+        self.rng = np.random.default_rng() if rng is None else rng
+
+    # Get the number of satisfying assignments over the n variables of a formula given as an (m, k) array
+    def getFormulaModelCount(self, formula):
+        return count_models(formula.tolist(), self.n)
 
-    # Generate a random forumla and get the number of satisfying assignments
-    def getModelCount(self):
-        self.solver = Solver()
-        for _ in range(ceil(self.r*self.n)):
-            self.solver.add_clause(self.__getRandomClause())
-        count = 0
-        # while True:
-        #     isSAT, SOL = self.solver.solve()
-        #     if isSAT:
-        #         count += 1
-        #         self.solver.add_clause(SOL)
-        #     else:
-        #         break
-        # Iterate over the solutions
-        while True:
-            # Try to find a solution
-            isSAT, SOL = self.solver.solve()
-            # If no more solutions exist, exit the loop
-            if isSAT != True:
-                break
-            
-            # Increment the number of solutions found
-            count += 1
-            # print(isSAT, self.solver.is_satisfiable())
-            # print(SOL)
-            # Add a blocking clause to exclude the current solution
-            blocking_clause = [-lit if SOL[lit] else lit
-                            for lit in range(1, len(SOL))]
-            self.solver.add_clause(blocking_clause)
-            # print(blocking_clause)
-            # print(self.solver.nb_clauses())
-            # break
-            # print(self.solver.nb_clauses())
-        # print(count)
-        return count
     # Get average number of satisfying assignments
     def getSATCount(self, numOfFormulas):
+        formulas = random_formulas(self.rng, self.k, self.n, ceil(self.r*self.n), numOfFormulas)
         count = 0
-        for _ in range(numOfFormulas):
-            count += self.getModelCount()
+        for formula in formulas:
+            count += self.getFormulaModelCount(formula)
         return count / numOfFormulas
 
 if __name__ == "__main__":
@@ -75,7 +39,9 @@ if __name__ == "__main__":
     parser.add_argument('--n', type=int, help='n size', default=150)
     parser.add_argument('--numOfForms', type=int, help='number of formulas', default=50)
     parser.add_argument('--rinterval', type=float, help='r interval size', default=0.2)
+    parser.add_argument('--seed', type=int, help='seed of the random formulas', default=None)
     args = parser.parse_args()
+    rng = np.random.default_rng(args.seed)
     kstart, kend, rstart, rend, n, numOfForms, rinterval = args.kstart, args.kend, args.rstart, args.rend, args.n, args.numOfForms, args.rinterval
     # We can plot multiple k-graphs at once if needed
     if kstart > kend:
@@ -100,7 +66,7 @@ if __name__ == "__main__":
         ypoints = []
         for r_val in np.arange(rstart, rend+rinterval, rinterval):
             # Get Probability for r_val, k and n
-            generator = FormulaGenerator(k, r_val, n)
+            generator = FormulaGenerator(k, r_val, n, rng)
             count = generator.getSATCount(numOfForms)
             xpoints.append(r_val)
             ypoints.append(count)
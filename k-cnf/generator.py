@@ -0,0 +1,38 @@
+import numpy as np
+
+# Random k-CNF formulas are drawn as integer arrays: one row per clause, one column per literal.
+
+
+def random_formulas(rng: np.random.Generator, k, n, m, count=None):
+    """
+    Draws random k-CNF formulas with m clauses over n variables. Every clause has k distinct variables, each
+    negated with probability 1/2.
+    :return: int32 array of shape (m, k), or (count, m, k) for a batch of count formulas
+    """
+    if k > n:
+        raise ValueError("a clause needs {} distinct variables but there are only {}".format(k, n))
+
+    shape = (m, k) if count is None else (count, m, k)
+    variables = rng.integers(1, n + 1, size=shape, dtype=np.int32)
+
+    # redraw the clauses with a repeated variable until there are none, which are few when k is small against n
+    while True:
+        ordered = np.sort(variables, axis=-1)
+        repeated = (ordered[..., 1:] == ordered[..., :-1]).any(axis=-1)
+        if not repeated.any():
+            break
+        variables[repeated] = rng.integers(1, n + 1, size=(np.count_nonzero(repeated), k), dtype=np.int32)
+
+    signs = rng.integers(0, 2, size=shape, dtype=np.int32) * 2 - 1
+    return variables * signs
+
+
+def zero_terminated(formula):
+    """
+    Flattens an (m, k) formula into one contiguous int32 array with every clause terminated by 0, the layout of
+    DIMACS which pycryptosat's `add_clauses` and the solver's `CNF` read without going through Python lists.
+    """
+    m, k = formula.shape
+    flat = np.zeros((m, k + 1), dtype=np.int32)
+    flat[:, :k] = formula
+    return flat.ravel()
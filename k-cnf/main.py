@@ -1,45 +1,39 @@
 import argparse
-import itertools
-import random
 from math import ceil
 import os
 from pycryptosat import Solver
 import matplotlib.pyplot as plt
 import numpy as np
 import time
+from generator import random_formulas, zero_terminated
+from sweep import cell_key, run_sweep
 
 class FormulaGenerator:
 
-    def __init__(self, k, r, n) -> None:
-        self.clause_types = list(itertools.product((-1, 1), repeat=k))
+    def __init__(self, k, r, n, rng=None) -> None:
         self.n = n
         self.r = r
         self.k = k
-        self.solver = Solver()
-    
-    # Generate a random clause
-    def __getRandomClause(self):
-        variables = random.sample(range(1, self.n+1), self.k)
-        clause_type = random.choice(self.clause_types)
-        clause = [a*b for a,b in zip(variables,clause_type)]
-        return clause
+        self.rng = np.random.default_rng() if rng is None else rng
+
+    # Check if a formula given as an (m, k) array is SAT or UNSAT
+    def isFormulaSAT(self, formula):
+        solver = Solver()
+        solver.add_clauses(zero_terminated(formula))
+        return solver.is_satisfiable()
 
-    # Generate a random forumla and check if it is SAT or UNSAT
-    def getRandomFormulaSAT(self):
-        for _ in range(ceil(self.r*self.n)):
-            self.solver.add_clause(self.__getRandomClause())
-        isSAT = self.solver.is_satisfiable()
-        # print(self.solver.nb_clauses(), self.solver.nb_vars(), isSAT)
-        self.solver = Solver()
-        return isSAT
+    # Check numOfFormulas random formulas, all the formulas are drawn at once
+    def getSATResults(self, numOfFormulas):
+        formulas = random_formulas(self.rng, self.k, self.n, ceil(self.r*self.n), numOfFormulas)
+        return [self.isFormulaSAT(formula) for formula in formulas]
 
     # Get SAT Probability
     def getSATProbability(self, numOfFormulas):
-        numOfSATs = 0
-        for _ in range(numOfFormulas):
-            if self.getRandomFormulaSAT():
-                numOfSATs += 1
-        return numOfSATs / numOfFormulas
+        return sum(self.getSATResults(numOfFormulas)) / numOfFormulas
+
+# Check random formulas in a worker process of the sweep, the results are 1 for SAT and 0 for UNSAT
+def evaluateSAT(k, r, n, numOfFormulas, seed):
+    return FormulaGenerator(k, r, n, np.random.default_rng(seed)).getSATResults(numOfFormulas)
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
@@ -50,6 +44,10 @@ if __name__ == "__main__":
     parser.add_argument('--n', type=int, help='n size', default=150)
     parser.add_argument('--numOfForms', type=int, help='number of formulas', default=50)
     parser.add_argument('--rinterval', type=float, help='r interval size', default=0.2)
+    parser.add_argument('--seed', type=int, help='seed of the random formulas, by default the seed of the checkpoint or a new one', default=None)
+    parser.add_argument('--jobs', type=int, help='number of worker processes', default=os.cpu_count())
+    parser.add_argument('--checkpoint', type=str, help='file where finished cells are saved, an interrupted sweep resumes from it', default=None)
+    parser.add_argument('--rounds', type=int, help='maximum number of rounds of numOfForms formulas near the threshold', default=4)
     args = parser.parse_args()
     kstart, kend, rstart, rend, n, numOfForms, rinterval = args.kstart, args.kend, args.rstart, args.rend, args.n, args.numOfForms, args.rinterval
     # We can plot multiple k-graphs at once if needed
@@ -68,6 +66,10 @@ if __name__ == "__main__":
     legend = []
     # Start Timer
     tic = time.perf_counter()
+    # Get Probability for every k and r_val in parallel
+    r_values = np.arange(rstart, rend+rinterval, rinterval)
+    probabilities = run_sweep(evaluateSAT, range(kstart, kend+1), r_values, n, numOfForms, args.jobs,
+                              args.checkpoint, args.seed, args.rounds)
     # Plot the graph
     for k in range(kstart, kend+1):
         legend.append('k={}'.format(k))
@@ -75,10 +77,8 @@ if __name__ == "__main__":
         isOne, isZero = True, False
         xpoints = []
         ypoints = []
-        for r_val in np.arange(rstart, rend+rinterval, rinterval):
-            # Get Probability for r_val, k and n
-            generator = FormulaGenerator(k, r_val, n)
-            SAT_prob = generator.getSATProbability(numOfForms)
+        for r_val in r_values:
+            SAT_prob = probabilities[cell_key(k, r_val)]
             if isOne and SAT_prob < 1:
                 prev_x, prev_y = xpoints[-1], ypoints[-1]
                 plt.text(prev_x, prev_y, '({:.2f}, {:.2f})'.format(prev_x, prev_y), color='red')
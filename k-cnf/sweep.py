@@ -0,0 +1,127 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+
+# A sweep evaluates random formulas on a grid of (k, r) cells. Every cell is sampled in rounds of `trials` formulas:
+# the first round covers the whole grid, the following ones only the cells whose results still vary the most, which
+# are the ones around the satisfiability threshold. Every finished round of a cell is appended to the checkpoint file
+# as one JSON line, so that an interrupted sweep resumes where it stopped. Every record holds the seed of its sweep,
+# a resumed sweep reuses it and ignores the records of other seeds, so that its results stay reproducible.
+
+
+def cell_key(k, r):
+    # the ratios come from np.arange and are rounded so that they match the ones read back from the checkpoint
+    return k, round(float(r), 6)
+
+
+def cell_seed(seed, k, r, round_index):
+    """
+    Seed of one round of a cell, derived from the seed of the sweep only, so that the results do not depend on the
+    order in which the workers finish.
+    """
+    return np.random.SeedSequence([seed, k, int(round(r * 1e6)), round_index])
+
+
+def read_checkpoint(path):
+    """
+    :return: list of the records of the checkpoint file, empty if there is none
+    """
+    records = []
+    if path is None or not os.path.exists(path):
+        return records
+
+    with open(path) as file:
+        for line in file:
+            if not line.strip():
+                continue
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                # the last line may be cut off if the sweep was killed while writing it
+                continue
+
+    return records
+
+
+def checkpoint_seed(path):
+    """
+    :return: the seed of the last sweep saved in the checkpoint file, or None
+    """
+    seeds = [record["seed"] for record in read_checkpoint(path) if "seed" in record]
+    return seeds[-1] if seeds else None
+
+
+def load_checkpoint(path, n, seed):
+    """
+    :return: dict with (k, r, round) as key and the record of that round as value, for the rounds of the given n
+    drawn with the given seed
+    """
+    records = {}
+    skipped = 0
+    for record in read_checkpoint(path):
+        if record.get("seed") != seed:
+            skipped += 1
+        elif record["n"] == n:
+            records[cell_key(record["k"], record["r"]) + (record["round"],)] = record
+
+    if skipped:
+        print('{} records of the checkpoint were drawn with another seed and are ignored'.format(skipped))
+
+    return records
+
+
+def evaluate_round(evaluate, k, r, n, trials, seed, round_index):
+    values = np.asarray(evaluate(k, r, n, trials, cell_seed(seed, k, r, round_index)), dtype=np.float64)
+    return {"k": k, "r": r, "n": n, "seed": seed, "trials": len(values), "sum": float(values.sum()),
+            "sum_squares": float((values * values).sum())}
+
+
+def run_sweep(evaluate, ks, rs, n, trials, jobs=None, checkpoint=None, seed=None, max_rounds=4, min_variance=0.09):
+    """
+    Runs `evaluate(k, r, n, trials, seed)`, which returns one value per random formula, for every (k, r) cell of the
+    grid in a pool of `jobs` processes. Cells whose sample variance is above `min_variance` get another round of
+    `trials` formulas, up to `max_rounds` rounds. For a 0/1 result the variance is p(1-p), so the default of 0.09 adds
+    samples where the probability is between 0.1 and 0.9. Without a `seed`, the sweep continues with the seed of its
+    checkpoint, or draws a new one if there is none.
+    :return: dict with (k, r) as key and the mean value of the cell as value
+    """
+    if seed is None:
+        seed = checkpoint_seed(checkpoint)
+        if seed is None:
+            seed = np.random.SeedSequence().entropy
+    print('seed={}'.format(seed), flush=True)
+    records = load_checkpoint(checkpoint, n, seed)
+    cells = [cell_key(k, r) for k in ks for r in rs]
+
+    def statistics(cell):
+        rounds = [records[cell + (index,)] for index in range(max_rounds) if cell + (index,) in records]
+        count = sum(record["trials"] for record in rounds)
+        total = sum(record["sum"] for record in rounds)
+        total_squares = sum(record["sum_squares"] for record in rounds)
+        mean = total / count
+        return mean, total_squares / count - mean * mean
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        for round_index in range(max_rounds):
+            if round_index == 0:
+                pending = cells
+            else:
+                pending = [cell for cell in cells if statistics(cell)[1] > min_variance]
+            pending = [cell for cell in pending if cell + (round_index,) not in records]
+
+            futures = {executor.submit(evaluate_round, evaluate, k, r, n, trials, seed, round_index): (k, r)
+                       for k, r in pending}
+            for future in as_completed(futures):
+                k, r = futures[future]
+                record = dict(future.result(), round=round_index)
+                records[(k, r, round_index)] = record
+                if checkpoint is not None:
+                    with open(checkpoint, "a") as file:
+                        file.write(json.dumps(record) + "\n")
+                print('k={} r={:.2f} round={} mean={:.3f}'.format(k, r, round_index, statistics((k, r))[0]),
+                      flush=True)
+
+    return {cell: statistics(cell)[0] for cell in cells}
@@ -0,0 +1,141 @@
+import multiprocessing
+import os
+import signal
+import time
+from multiprocessing.connection import wait
+from typing import Optional
+
+try:
+    import resource
+except ImportError:  # not available on Windows, the memory limit is ignored there
+    resource = None
+
+import cdcl
+
+
+class InstanceTimeout(Exception):
+    pass
+
+
+def raise_timeout(signum, frame):
+    raise InstanceTimeout()
+
+
+def limit_memory(memory_limit: Optional[int]) -> None:
+    """
+    Called first in every worker process: caps its address space to `memory_limit` MB, so that an instance which
+    needs too much memory fails with a MemoryError instead of taking the whole machine down.
+    """
+    if memory_limit is not None and resource is not None:
+        limit = memory_limit * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def solve_instance(input_file: str, timeout: Optional[float], options: dict) -> dict:
+    """
+    Solves a single instance inside a worker process.
+    :return: dict with the file, its status (SAT, UNSAT, TIMEOUT, MEMOUT or ERROR) and the statistics of the run
+    """
+    result = {"file": input_file, "status": "ERROR", "cpu_time": 0.0, "decisions": 0, "unit_propagations": 0,
+              "restarts": 0}
+    start_time = time.time()
+    if timeout is not None:
+        signal.signal(signal.SIGALRM, raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+
+    try:
+        _, sat, _, cpu_time, decisions, unit_propagations, restarts = cdcl.solve_file(input_file, **options)
+        result.update(status="SAT" if sat else "UNSAT", cpu_time=cpu_time, decisions=decisions,
+                      unit_propagations=unit_propagations, restarts=restarts)
+
+    except InstanceTimeout:
+        result.update(status="TIMEOUT", cpu_time=time.time() - start_time)
+
+    except MemoryError:
+        result.update(status="MEMOUT", cpu_time=time.time() - start_time)
+
+    except Exception as error:
+        result.update(error=str(error), cpu_time=time.time() - start_time)
+
+    finally:
+        if timeout is not None:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+    return result
+
+
+def instance_worker(input_file: str, timeout: Optional[float], memory_limit: Optional[int], options: dict,
+                    connection) -> None:
+    """
+    Solves a single instance in its own process and sends the result dict to the parent process.
+    """
+    limit_memory(memory_limit)
+    connection.send(solve_instance(input_file, timeout, options))
+    connection.close()
+
+
+def run_batch(folder: str, jobs: Optional[int] = None, timeout: Optional[float] = None,
+              memory_limit: Optional[int] = None, **options) -> list:
+    """
+    Solves every `.cnf` file of the folder with up to `jobs` worker processes at a time, see `cdcl.solve_formula`
+    for the options. Every instance gets its own process, so a worker which dies only loses its own instance.
+    Every result is printed as soon as its instance is finished, followed by a summary.
+    :return: list of the result dicts in the order in which the instances finished
+    """
+    files = sorted(os.path.join(folder, name) for name in os.listdir(folder)
+                   if name.endswith((".cnf", ".cnf.gz", ".cnf.bz2", ".cnf.xz")))
+    jobs = jobs or os.cpu_count()
+    pending = list(reversed(files))
+    running = {}  # dict: (process, connection, file) of the worker with `key` sentinel
+    results = []
+
+    try:
+        while pending or running:
+            while pending and len(running) < jobs:
+                input_file = pending.pop()
+                receiver, sender = multiprocessing.Pipe(duplex=False)
+                process = multiprocessing.Process(target=instance_worker, daemon=True,
+                                                  args=(input_file, timeout, memory_limit, options, sender))
+                process.start()
+                sender.close()
+                running[process.sentinel] = (process, receiver, input_file)
+
+            for sentinel in wait(list(running)):
+                process, receiver, input_file = running.pop(sentinel)
+                try:
+                    result = receiver.recv()
+
+                except EOFError:
+                    # the worker died before reporting, e.g. killed by the operating system
+                    result = {"file": input_file, "status": "ERROR", "cpu_time": 0.0, "decisions": 0,
+                              "unit_propagations": 0, "restarts": 0,
+                              "error": "worker exited with code {}".format(process.exitcode)}
+
+                receiver.close()
+                process.join()
+
+                results.append(result)
+                line = "[{}/{}] {} {} {:.2f}s".format(len(results), len(files), os.path.basename(result["file"]),
+                                                      result["status"], result["cpu_time"])
+                if "error" in result:
+                    line += " ({})".format(result["error"])
+
+                print(line, flush=True)
+
+    finally:
+        for process, _, _ in running.values():
+            process.terminate()
+            process.join()
+
+    solved = [result for result in results if result["status"] in ("SAT", "UNSAT")]
+    print("Number of satisfiable formulas =", sum(result["status"] == "SAT" for result in results))
+    print("Number of unsatisfiable formulas =", sum(result["status"] == "UNSAT" for result in results))
+    print("Number of unsolved formulas =", len(results) - len(solved))
+    if solved:
+        print("Average CPU time =", sum(result["cpu_time"] for result in solved) / len(solved))
+        print("Average number of decisions =", sum(result["decisions"] for result in solved) / len(solved))
+        print("Average number of unit propagations =",
+              sum(result["unit_propagations"] for result in solved) / len(solved))
+        print("Average number of restarts =", sum(result["restarts"] for result in solved) / len(solved))
+
+    return results
@@ -1,38 +1,75 @@
 import argparse
 from ast import List
 import os
+import random
 import time
-from typing import Tuple, Optional
+from typing import Tuple, Optional, Sequence
 from matplotlib import pyplot as plt
 import numpy as np
 from cnf import CNF
+from dimacs import read_dimacs
+from restarts import RestartPolicy, GeometricRestart, RESTART_POLICIES, make_restart_policy
+from sharing import ClauseExchange
+from preprocess import Preprocessor
+from local_search import LocalSearch, LOCAL_SEARCH_ALGORITHMS
 
-def cdcl(cnf_formula: CNF, heuristic: int = 1):
+def cdcl(cnf_formula: CNF, heuristic: int = 1, restart_policy: Optional[RestartPolicy] = None,
+         rephase: str = "none", rephase_interval: int = 10, clause_exchange: Optional[ClauseExchange] = None,
+         assumptions: Sequence[int] = (), substitution_interval: int = 0, vivification_interval: int = 0,
+         hybrid: Optional[str] = None, hybrid_interval: int = 10):
     """
-    cdcl algorithm
+    cdcl algorithm, the saved phases are reset with the given `rephase` mode every `rephase_interval` restarts.
+    With a `clause_exchange`, short learned clauses are shared with the other solvers at every restart.
+    The `assumptions` are decided first, one per decision level. If the formula is unsatisfiable under them,
+    `cnf_formula.final_conflict` holds the assumptions responsible for it. The formula may be solved again, the
+    learned clauses are kept. Equivalent literals are substituted every `substitution_interval` restarts (never if
+    it is 0), except when solving under assumptions. The learned clauses are vivified every `vivification_interval`
+    restarts (never if it is 0), with a budget of propagations proportional to the ones of the search since the last
+    time. With `hybrid` (`walksat` or `probsat`), a burst of local search runs every `hybrid_interval` restarts,
+    from the saved phases and from the best phases in turn. Its best assignment becomes the saved phases and a model
+    it finds is returned straight away.
     """
+    if restart_policy is None:
+        restart_policy = GeometricRestart()
+
     # Initialize the decision level and the number of decisions
     decision_level = 0
     decisions = 0
     unit_propagations = 0
     restarts = 0
     conflicts = 0
-    conflicts_limit = 1000
-    lbd_limit = 3
+    reduce_interval = 2000
+    reduce_limit = reduce_interval  # number of conflicts at which the learned clauses are reduced next
+    vivified_propagations = 0  # number of unit propagations at the end of the last vivification
+
+    # Start from decision level 0 in case the formula was solved before
+    cnf_formula.backtrack(decision_level)
+    cnf_formula.final_conflict = []
 
     # Unit propagation
     propagated_literals, antecedent_of_conflict = cnf_formula.unit_propagation(decision_level)
     unit_propagations += len(propagated_literals)
 
-    if antecedent_of_conflict:
+    if antecedent_of_conflict is not None:
         return False, [], decisions, unit_propagations, restarts
 
 
-    while not cnf_formula.all_variables_assigned():
-        decision_literal = cnf_formula.pick_branching_variable(heuristic)
-
+    while decision_level < len(assumptions) or not cnf_formula.all_variables_assigned():
         decision_level += 1
 
+        if decision_level <= len(assumptions):
+            decision_literal = assumptions[decision_level - 1]
+            if cnf_formula.assignment[abs(decision_literal)] == -decision_literal:
+                cnf_formula.final_conflict = cnf_formula.analyze_final(decision_literal)
+                return False, [], decisions, unit_propagations, restarts
+
+            # an assumption which already holds gets an empty decision level
+            if cnf_formula.assignment[abs(decision_literal)] == decision_literal:
+                continue
+
+        else:
+            decision_literal = cnf_formula.pick_branching_variable(heuristic)
+
         # Assign the decision literal
         cnf_formula.assign_literal(decision_literal, decision_level)
         decisions += 1
@@ -41,51 +78,131 @@ def cdcl(cnf_formula: CNF, heuristic: int = 1):
         propagated_literals, antecedent_of_conflict = cnf_formula.unit_propagation(decision_level)
         unit_propagations += len(propagated_literals)
 
-        while antecedent_of_conflict:
+        while antecedent_of_conflict is not None:
             conflicts += 1
 
-            # Restart if conflicts limit is reached
-            if conflicts == conflicts_limit:
-                conflicts = 0
-                conflicts_limit = int(conflicts_limit * 1.1)
-                lbd_limit = lbd_limit * 1.1
-                restarts += 1
-                decision_level = 0
-                cnf_formula.restart()
-                cnf_formula.delete_learned_clauses_by_lbd(lbd_limit)
-                break
-            
             # Conflict analysis
-            backtrack_level = cnf_formula.conflict_analysis(antecedent_of_conflict, decision_level)
+            backtrack_level, learned_clause = cnf_formula.conflict_analysis(antecedent_of_conflict, decision_level)
             if backtrack_level < 0:
                 return False, [], decisions, unit_propagations, restarts
 
+            if clause_exchange is not None:
+                clause_exchange.export(cnf_formula.arena.clause_literals(learned_clause),
+                                       cnf_formula.arena.lbd[learned_clause])
+
             # Backtracking
             cnf_formula.backtrack(backtrack_level)
             decision_level = backtrack_level
 
+            # Assign the asserted literal of the learned clause
+            cnf_formula.assign_literal(cnf_formula.arena.first_literal(learned_clause), decision_level, learned_clause)
+
+            # Restart if the restart policy says so, the learned clause is kept
+            restart_policy.on_conflict(cnf_formula.arena.lbd[learned_clause])
+            if restart_policy.should_restart():
+                restart_policy.on_restart()
+                restarts += 1
+                decision_level = 0
+                cnf_formula.restart()
+                if rephase != "none" and restarts % rephase_interval == 0:
+                    cnf_formula.rephase(rephase)
+                if clause_exchange is not None:
+                    clause_exchange.synchronize(cnf_formula)
+                if substitution_interval and not assumptions and restarts % substitution_interval == 0:
+                    cnf_formula.substitute_equivalent_literals()
+                if vivification_interval and restarts % vivification_interval == 0:
+                    budget = (unit_propagations - vivified_propagations) * cnf_formula.vivification_effort
+                    unit_propagations += cnf_formula.vivify_learned_clauses(int(budget))
+                    vivified_propagations = unit_propagations
+                if hybrid is not None and restarts % hybrid_interval == 0:
+                    if restarts // hybrid_interval % 2:
+                        phases = cnf_formula.saved_phase
+                    else:
+                        phases = cnf_formula.best_phase
+                    model = cnf_formula.local_search_burst(hybrid, phases, assumptions)
+                    if model is not None:
+                        return True, cnf_formula.model(model), decisions, unit_propagations, restarts
+
+            # Reduce the learned clauses every few conflicts, the interval grows each time
+            if conflicts >= reduce_limit:
+                cnf_formula.reduce_learned_clauses()
+                reduce_interval += 300
+                reduce_limit += reduce_interval
+
             # Unit propagation of the learned clause
             propagated_literals, antecedent_of_conflict = cnf_formula.unit_propagation(decision_level)
             unit_propagations += len(propagated_literals)
 
-    return True, list(cnf_formula.assignment_stack), decisions, unit_propagations, restarts
+    return True, cnf_formula.model(), decisions, unit_propagations, restarts
+
+
+def solve_formula(cnf_formula: CNF, heuristic: int = 1, minimization: int = 2, restart: str = "geometric",
+                  phase_saving: bool = True, rephase: str = "none",
+                  rephase_interval: int = 10, seed: Optional[int] = None,
+                  clause_exchange: Optional[ClauseExchange] = None,
+                  assumptions: Sequence[int] = (), substitution_interval: int = 0,
+                  vivification_interval: int = 0, hybrid: Optional[str] = None,
+                  hybrid_interval: int = 10) -> Tuple[bool, list, float, int, int, int]:
+    """
+    Run the cdcl algorithm on the given formula with the given options. The `seed` drives the random heuristics and
+    the tie-breaking of VSIDS.
+    """
+    cnf_formula.clause_minimization = minimization
+    cnf_formula.phase_saving = phase_saving
+    if seed is not None:
+        random.seed(seed)
+        cnf_formula.randomize_activity(seed)
+    start_time = time.time()
+    sat, model, decisions, unit_propagations, restarts = cdcl(cnf_formula, heuristic, make_restart_policy(restart),
+                                                             rephase, rephase_interval, clause_exchange, assumptions,
+                                                             substitution_interval, vivification_interval, hybrid,
+                                                             hybrid_interval)
+    cpu_time = time.time() - start_time
+
+    return sat, model, cpu_time, decisions, unit_propagations, restarts
 
 
-def execute(input_file: str, heuristic: int = 1) -> Optional[Tuple[bool, list, float, int, int, int]]:
+def solve_file(input_file: str, preprocess: bool = False, local_search: Optional[str] = None,
+               max_flips: int = 1000000, **options) -> Tuple[Optional[CNF], bool, list, float, int, int, int]:
     """
-    Execute the cdcl algorithm on the given input file.
+    Run the cdcl algorithm on the given input file without printing anything, see `solve_formula` for the options.
+    With `preprocess`, the formula is simplified first and the model is extended back to the original formula.
+    With `local_search` (`walksat` or `probsat`), local search looks for a model for up to `max_flips` flips first,
+    the cdcl algorithm only runs if it finds none. The formula is None when local search found the model, the cdcl
+    counters are then 0.
     """
-    input = open(input_file, mode="r")
-    dimacs_formula = input.read()
-    dimacs_formula = dimacs_formula.splitlines()
+    dimacs_formula = read_dimacs(input_file)
+    search_time = 0.0
+    if local_search is not None:
+        start_time = time.time()
+        searcher = LocalSearch(dimacs_formula.clauses(), dimacs_formula.num_variables, options.get("seed"))
+        if LOCAL_SEARCH_ALGORITHMS[local_search](searcher, max_flips):
+            return None, True, searcher.model(), time.time() - start_time, 0, 0, 0
+
+        search_time = time.time() - start_time
 
-    formula = [list(map(int, clause[:-2].strip().split())) for clause in dimacs_formula if clause != "" and
-               clause[0] not in ["c", "p", "%", "0"]]
+    if not preprocess:
+        cnf_formula = CNF(dimacs_formula.literals)
+        sat, model, cpu_time, decisions, unit_propagations, restarts = solve_formula(cnf_formula, **options)
+        return cnf_formula, sat, model, search_time + cpu_time, decisions, unit_propagations, restarts
 
-    cnf_formula = CNF(formula)
     start_time = time.time()
-    sat, model, decisions, unit_propagations, restarts = cdcl(cnf_formula, heuristic)
-    cpu_time = time.time() - start_time
+    preprocessor = Preprocessor(dimacs_formula.clauses(), dimacs_formula.num_variables)
+    cnf_formula = CNF(preprocessor.run())
+    preprocessing_time = time.time() - start_time
+    sat, model, cpu_time, decisions, unit_propagations, restarts = solve_formula(cnf_formula, **options)
+    if sat:
+        model = preprocessor.extend_model(model)
+
+    return (cnf_formula, sat, model, search_time + preprocessing_time + cpu_time, decisions, unit_propagations,
+            restarts)
+
+
+def execute(input_file: str, **options) -> Optional[Tuple[bool, list, float, int, int, int]]:
+    """
+    Execute the cdcl algorithm on the given input file, see `solve_formula` for the options.
+    """
+    cnf_formula, sat, model, cpu_time, decisions, unit_propagations, restarts = solve_file(input_file, **options)
 
     if sat:
         model.sort(key=abs)
@@ -96,9 +213,13 @@ def execute(input_file: str, heuristic: int = 1) -> Optional[Tuple[bool, list, f
         print("CNF IS UNSAT... :C")
     print()
     print("Total time taken =", cpu_time, "s")
-    print("Number of picks =", decisions)
-    print("Number of steps of unit propagation =", unit_propagations)
-    print("Number of restarts =", restarts)
+    if cnf_formula is None:
+        print("Solved by local search, the cdcl algorithm did not run.")
+    else:
+        print("Number of picks =", decisions)
+        print("Number of steps of unit propagation =", unit_propagations)
+        print("Number of restarts =", restarts)
+        print("Number of literals removed by clause minimization =", cnf_formula.minimized_literals)
 
     return sat, model, cpu_time, decisions, unit_propagations, restarts
 
@@ -108,39 +229,104 @@ if __name__ == "__main__":
     print('Project by JS Peh and Shion S.')
     print('Run program with -h for options.')
     parser = argparse.ArgumentParser()
-    parser.add_argument("input", type=str, help="Input file which contains a description of a formula.")
-    parser.add_argument("--heuristic", type=int, default=1, help="Specify a decision heuristic: `0` is 2-clause, `1` is VSIDS, `2` is unassigned, `3` is random, `4` is jeroslow-wang.")
+    parser.add_argument("input", type=str, nargs="?", help="Input file which contains a description of a formula.")
+    parser.add_argument("--batch", type=str, help="Solve every `.cnf` file of the given folder instead of a single input file.")
+    parser.add_argument("--count", action="store_true", help="Count the models of the input file instead of solving it.")
+    parser.add_argument("--portfolio", action="store_true", help="Run several configurations on the input file in parallel, the first answer wins.")
+    parser.add_argument("--share", action="store_true", help="Share short learned clauses between the solvers of the portfolio.")
+    parser.add_argument("--cube-depth", type=int, default=None, help="Split the input file into at most 2^depth cubes by lookahead and solve them in parallel.")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count(), help="Number of worker processes in batch, portfolio and cube mode.")
+    parser.add_argument("--timeout", type=float, default=None, help="Time limit in seconds for each instance in batch, portfolio and cube mode.")
+    parser.add_argument("--memory-limit", type=int, default=None, help="Memory limit in MB for each worker process in batch mode.")
+    parser.add_argument("--heuristic", type=int, default=None, help="Specify a decision heuristic: `0` is 2-clause, `1` is VSIDS (default), `2` is unassigned, `3` is random, `4` is jeroslow-wang.")
+    parser.add_argument("--minimization", type=int, default=2, choices=[0, 1, 2], help="Specify the learned clause minimization: `0` is none, `1` is self-subsuming, `2` is recursive.")
+    parser.add_argument("--restart", type=str, default=None, choices=list(RESTART_POLICIES), help="Specify a restart policy: `geometric` (default) grows the conflicts limit by 1.1x, `luby` follows the Luby sequence, `glucose` compares fast and slow moving averages of the learned clause LBD.")
+    parser.add_argument("--preprocess", action="store_true", help="Simplify the formula by subsumption, variable elimination and failed literal probing before solving it.")
+    parser.add_argument("--local-search", type=str, default=None, choices=list(LOCAL_SEARCH_ALGORITHMS), help="Look for a model by local search before running cdcl, for satisfiable formulas: `walksat` flips the variable breaking the fewest clauses or a random one, `probsat` picks it with a probability decreasing with its break score.")
+    parser.add_argument("--max-flips", type=int, default=1000000, help="Number of flips after which local search gives up.")
+    parser.add_argument("--hybrid", type=str, default=None, choices=list(LOCAL_SEARCH_ALGORITHMS), help="Run bursts of the given local search during cdcl, their best assignments become the saved phases.")
+    parser.add_argument("--hybrid-interval", type=int, default=10, help="Number of restarts between two bursts of local search.")
+    parser.add_argument("--substitution-interval", type=int, default=0, help="Number of restarts between two substitutions of equivalent literals during the search, `0` disables them.")
+    parser.add_argument("--vivification-interval", type=int, default=0, help="Number of restarts between two vivifications of the learned clauses, `0` disables them.")
+    parser.add_argument("--no-phase-saving", action="store_true", help="Let the heuristic pick the polarity of every decision instead of reusing the last polarity of the variable.")
+    parser.add_argument("--rephase", type=str, default="none", choices=["none", "best", "original", "inverted"], help="Specify how the saved phases are reset periodically: `best` is the longest assignment so far, `original` lets the heuristics choose again, `inverted` flips them.")
+    parser.add_argument("--rephase-interval", type=int, default=10, help="Number of restarts between two rephasings.")
     args = parser.parse_args()
 
-    execute(args.input, args.heuristic)
-    # cnf_folder = args.input # folder name
-    # cnf_files = sorted([os.path.join(cnf_folder, f) for f in os.listdir(cnf_folder) if f.endswith('.cnf')])
-    # cpu_times_list = []
-    # decisions_list = []
-    # unit_propagations_list = []
-    # restarts_list = []
-    # sat_count = 0
-    # unsat_count = 0
-    
-    # for file_path in cnf_files:
-    #     sat, model, cpu_time, decisions, unit_propagations, restarts = execute(file_path, args.heuristic)
-    #     if sat:
-    #         sat_count += 1
-    #     else :
-    #         unsat_count += 1
-    #     cpu_times_list.append(cpu_time)
-    #     decisions_list.append(decisions)
-    #     unit_propagations_list.append(unit_propagations)
-    #     restarts_list.append(restarts)
-            
-    # print(f"Total number of SAT: {sat_count}")
-    # print(f"Total number of UNSAT: {unsat_count}")
+    if (args.input is None) == (args.batch is None):
+        parser.error("specify either an input file or --batch")
+    if args.share and not args.portfolio:
+        parser.error("--share only applies to --portfolio")
+    # every configuration of the portfolio has its own heuristic and restart policy
+    if args.portfolio and (args.heuristic is not None or args.restart is not None):
+        parser.error("--heuristic and --restart cannot be combined with --portfolio")
+    # the cube workers solve the parsed formula under assumptions, without the other modes and stages
+    if args.cube_depth is not None:
+        for flag, given in (("--batch", args.batch is not None), ("--count", args.count),
+                            ("--portfolio", args.portfolio), ("--preprocess", args.preprocess),
+                            ("--local-search", args.local_search is not None)):
+            if given:
+                parser.error("{} cannot be combined with --cube-depth".format(flag))
+
+    heuristic = 1 if args.heuristic is None else args.heuristic
+    restart = "geometric" if args.restart is None else args.restart
+    options = dict(heuristic=heuristic, minimization=args.minimization, restart=restart,
+                   phase_saving=not args.no_phase_saving, rephase=args.rephase, rephase_interval=args.rephase_interval,
+                   substitution_interval=args.substitution_interval,
+                   vivification_interval=args.vivification_interval, hybrid=args.hybrid,
+                   hybrid_interval=args.hybrid_interval)
+    if args.batch:
+        from batch import run_batch  # batch imports this module for its workers
+        run_batch(args.batch, args.jobs, args.timeout, args.memory_limit, preprocess=args.preprocess,
+                  local_search=args.local_search, max_flips=args.max_flips, **options)
+    elif args.count:
+        from counting import ModelCounter
+        dimacs_formula = read_dimacs(args.input)
+        counter = ModelCounter()
+        start_time = time.time()
+        models = counter.count(dimacs_formula.clauses(), dimacs_formula.num_variables)
+        print("Number of models =", models)
+        print()
+        print("Total time taken =", time.time() - start_time, "s")
+        print("Number of picks =", counter.decisions)
+        print("Number of cache hits =", counter.cache_hits)
+    elif args.portfolio:
+        from portfolio import run_portfolio
+        answer = run_portfolio(args.input, args.jobs, args.timeout, share=args.share, preprocess=args.preprocess,
+                               **options)
+        if answer is None:
+            print("No configuration finished within the time limit.")
+        else:
+            config, sat, model, wall_time, decisions, unit_propagations, restarts = answer
+            print("CNF IS SAT!! :D" if sat else "CNF IS UNSAT... :C")
+            if sat:
+                print("Solution is", sorted(model, key=abs))
+            print()
+            print("Winning configuration =", config)
+            print("Total time taken =", wall_time, "s")
+            print("Number of picks =", decisions)
+            print("Number of steps of unit propagation =", unit_propagations)
+            print("Number of restarts =", restarts)
+    elif args.cube_depth is not None:
+        from cube import run_cube_and_conquer
+        answer = run_cube_and_conquer(args.input, args.cube_depth, args.jobs, args.timeout, **options)
+        if answer is None:
+            print("The cubes were not solved within the time limit.")
+        else:
+            sat, model, cubes, wall_time, decisions, unit_propagations, restarts = answer
+            print("CNF IS SAT!! :D" if sat else "CNF IS UNSAT... :C")
+            if sat:
+                print("Solution is", sorted(model, key=abs))
+            print()
+            print("Number of cubes =", cubes)
+            print("Total time taken =", wall_time, "s")
+            print("Number of picks =", decisions)
+            print("Number of steps of unit propagation =", unit_propagations)
+            print("Number of restarts =", restarts)
+    else:
+        execute(args.input, preprocess=args.preprocess, local_search=args.local_search, max_flips=args.max_flips,
+                **options)
 
-    # print(f"Avg. CPU time: {sum(cpu_times_list)/len(cpu_times_list):.7f}s")
-    # print(f"Avg. decision count: {sum(decisions_list)/len(decisions_list)}")
-    # print(f"Avg. unit propagation count: {sum(unit_propagations_list)/len(unit_propagations_list)}")
-    # print(f"Avg. restart count: {sum(restarts_list)/len(restarts_list)}")
-    
     '''
     The following generates the graphs for the report
     '''
@@ -166,7 +352,7 @@ if __name__ == "__main__":
     #         sat_count = 0
     #         unsat_count = 0
     #         for file_path in cnf_files:
-    #             sat, model, cpu_time, decisions, unit_propagations, restarts = execute(file_path, heuristic)
+    #             sat, model, cpu_time, decisions, unit_propagations, restarts = execute(file_path, heuristic=heuristic)
     #             if sat:
     #                 sat_count += 1
     #             else :
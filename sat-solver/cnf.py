@@ -1,274 +1,675 @@
-from collections import Counter, deque
+from array import array
+from itertools import chain
 import random
 import numpy as np
-from typing import Tuple, Optional
-class Clause:
-    def __init__(self, literals, w1=None, w2=None, learned=False, lbd=0):
-        self.literals = literals  # describes how exactly does this clause look like
-        self.size = len(self.literals)
-        self.w1 = w1
-        self.w2 = w2
-        self.learned = learned
-        self.lbd = lbd
-
-        if (not w1) and (not w2):
-            if len(self.literals) > 1:
-                self.w1 = 0
-                self.w2 = 1
-            elif len(self.literals) > 0:
-                self.w1 = self.w2 = 0
-
-    def partial_assignment(self, assignment: list) -> list:
+from typing import Tuple, Optional, Iterable, Sequence
+from heap import VariableHeap
+from equivalences import equivalent_literals
+from local_search import LocalSearch, LOCAL_SEARCH_ALGORITHMS
+NO_CLAUSE = -1  # clause reference used for decisions and unassigned variables
+
+
+class ClauseArena:
+    """
+    Stores every clause in flat arrays instead of one object per clause. A clause is referenced by its index,
+    its literals are `literals[start[clause]:start[clause] + size[clause]]` and the two watched literals are always
+    the first two of them.
+    """
+
+    def __init__(self):
+        self.literals = array('i')  # literals of all the clauses one after the other
+        self.start = array('i')  # offset of the first literal of the clause in `literals`
+        self.size = array('i')
+        self.lbd = array('i')
+        self.learned = array('b')
+        self.used = array('b')  # whether the clause took part in conflict analysis since the last reduction
+        self.vivified = array('b')  # whether vivification already tried to shorten the clause
+        self.deleted = array('b')
+        self.activity = array('d')  # bumped when the clause takes part in conflict analysis
+        self.wasted = 0  # number of literals of deleted clauses which are still stored
+
+    def __len__(self) -> int:
+        return len(self.start)
+
+    def add(self, literals, learned: bool = False, lbd: int = 0) -> int:
+        """
+        Stores a new clause.
+        :return: the reference of the clause
+        """
+        self.start.append(len(self.literals))
+        self.size.append(len(literals))
+        self.literals.extend(literals)
+        self.lbd.append(lbd)
+        self.learned.append(learned)
+        self.used.append(False)
+        self.vivified.append(False)
+        self.deleted.append(False)
+        self.activity.append(0.0)
+        return len(self.start) - 1
+
+    def add_zero_terminated(self, literals: array) -> list:
+        """
+        Stores all the clauses of a flat array of literals where every clause is terminated by 0.
+        :return: the references of the clauses
+        """
+        clauses = []
+        start = 0
+        while start < len(literals):
+            end = literals.index(0, start)
+            clause = len(self.start)
+            self.start.append(len(self.literals))
+            self.size.append(end - start)
+            self.literals.extend(literals[start:end])
+            clauses.append(clause)
+            start = end + 1
+
+        count = len(clauses)
+        self.lbd.extend(array('i', [0]) * count)
+        self.learned.frombytes(bytes(count))
+        self.used.frombytes(bytes(count))
+        self.vivified.frombytes(bytes(count))
+        self.deleted.frombytes(bytes(count))
+        self.activity.extend(array('d', [0.0]) * count)
+        return clauses
+
+    def clause_literals(self, clause: int) -> array:
+        return self.literals[self.start[clause]:self.start[clause] + self.size[clause]]
+
+    def first_literal(self, clause: int) -> int:
+        return self.literals[self.start[clause]]
+
+    def delete(self, clause: int) -> None:
+        self.deleted[clause] = True
+        self.wasted += self.size[clause]
+
+    def partial_assignment(self, clause: int, assignment: list) -> list:
         unassigned = []
-        for literal in self.literals:
+        for literal in self.clause_literals(clause):
             if assignment[abs(literal)] == literal:
                 return []
 
             if assignment[abs(literal)] == 0:
                 unassigned.append(literal)
 
-        return list(unassigned)
-
-    def update_watched_literal(self, assignment: list, new_variable: int) -> Tuple[bool, int, Optional[int]]:
-
-        # If the new variable assignment is the same as the watched literal, then swap the watched literals
-        if new_variable == abs(self.literals[self.w2]):
-            temp = self.w1
-            self.w1 = self.w2
-            self.w2 = temp
+        return unassigned
 
-        if (self.literals[self.w1] == assignment[abs(self.literals[self.w1])] or
-                self.literals[self.w2] == assignment[abs(self.literals[self.w2])]):
-            return True, self.literals[self.w1], False
-
-
-        if (-self.literals[self.w1] == assignment[abs(self.literals[self.w1])] and
-                -self.literals[self.w2] == assignment[abs(self.literals[self.w2])]):
-            return False, self.literals[self.w1], False
-
-
-        if (-self.literals[self.w1] == assignment[abs(self.literals[self.w1])] and
-                assignment[abs(self.literals[self.w2])] == 0):
-            old_w1 = self.w1
-            for w in [(self.w1 + i) % self.size for i in range(self.size)]:
-                if w == self.w2 or -self.literals[w] == assignment[abs(self.literals[w])]:
-                    continue
+    def is_satisfied(self, clause: int, assignment: list) -> bool:
+        """
+        Checks whether one of the watched literals of the clause is satisfied.
+        """
+        start = self.start[clause]
+        return (self.literals[start] == assignment[abs(self.literals[start])] or
+                self.literals[start + 1] == assignment[abs(self.literals[start + 1])])
 
-                self.w1 = w
-                break
+    def collect_garbage(self) -> array:
+        """
+        Drops the deleted clauses and moves the remaining ones to the front of the arrays.
+        :return: array with the old reference as index and the new reference (or NO_CLAUSE) as value
+        """
+        relocation = array('i', [NO_CLAUSE]) * len(self.start)
+        literals = array('i')
+        start = array('i')
+        for clause in range(len(self.start)):
+            if self.deleted[clause]:
+                continue
+
+            relocation[clause] = len(start)
+            start.append(len(literals))
+            literals.extend(self.clause_literals(clause))
+
+        kept = [clause for clause in range(len(self.start)) if not self.deleted[clause]]
+        self.literals = literals
+        self.start = start
+        self.size = array('i', (self.size[clause] for clause in kept))
+        self.lbd = array('i', (self.lbd[clause] for clause in kept))
+        self.learned = array('b', (self.learned[clause] for clause in kept))
+        self.used = array('b', (self.used[clause] for clause in kept))
+        self.vivified = array('b', (self.vivified[clause] for clause in kept))
+        self.deleted = array('b', bytes(len(kept)))
+        self.activity = array('d', (self.activity[clause] for clause in kept))
+        self.wasted = 0
+        return relocation
 
 
-            if self.w1 == old_w1:
-                return True, self.literals[self.w1], True
+class CNF:
 
-            return True, self.literals[self.w1], False
+    def __init__(self, formula):
+        if isinstance(formula, np.ndarray):
+            # an (m, k) array of clauses as drawn by the k-cnf scripts gets a column of terminating zeros
+            if formula.ndim == 2:
+                formula = np.hstack((formula, np.zeros((len(formula), 1), dtype=formula.dtype))).ravel()
 
-    def is_satisfied(self, assignment: list) -> bool:
-        return (self.literals[self.w1] == assignment[abs(self.literals[self.w1])] or
-                self.literals[self.w2] == assignment[abs(self.literals[self.w2])])
+            if formula.ndim != 1 or len(formula) and formula[-1] != 0:
+                raise ValueError("expected an (m, k) array of clauses or a flat zero terminated buffer of literals")
 
-class CNF:
+            formula = array('i', formula.astype(np.int32).tobytes())
+        self.formula = formula  # list of lists of lits, or flat array of lits with every clause terminated by 0
+        self.arena = ClauseArena()  # storage of the literals of all clauses
+        if isinstance(formula, array):
+            self.clauses = self.arena.add_zero_terminated(formula)  # list of clause references
 
-    def __init__(self, formula):
-        self.formula = formula  # list of lists of lits
-        self.clauses = [Clause(literals) for literals in self.formula]  # list of clauses
-        self.learned_clauses = []
+        else:
+            self.clauses = [self.arena.add(literals) for literals in self.formula]
+        self.learned_clauses = []  # list of learned clause references
         self.variables = set()  # set of variables in the formula
-        self.watched_lists = {}  # dict: list of clauses with `key` literal watched
-        self.unit_clauses_queue = deque()  # queue for unit clauses
-        self.assignment_stack = deque()  # stack: current assignment for backtracking
+        self.watched_lists = {}  # dict: list of clause references with `key` literal watched, for both polarities
+        self.binary_implications = {}  # dict: list of (implied literal, binary clause reference) when `key` is true
+        self.assignment_stack = []  # stack: current assignment for backtracking, also the propagation queue
+        self.propagation_head = 0  # index of the first literal in `assignment_stack` which is not yet propagated
+        self.root_conflict = None  # clause reference falsified at decision level 0, the formula is unsatisfiable
         self.assignment = None  # list with `variable` as index and `+variable/-variable/0` as values
-        self.antecedent = None  # list with `variable` as index and `Clause` as value
+        self.antecedent = None  # list with `variable` as index and clause reference (or NO_CLAUSE) as value
         self.decision_level = None  # list with `variable` as index and `decision level` as value
+        self.seen = None  # list with `variable` as index and whether it was visited by conflict analysis as value
+        self.saved_phase = None  # list with `variable` as index and its last assigned literal (or 0) as value
+        self.best_phase = None  # list with `variable` as index and its literal in the longest assignment as value
+        self.best_assignment_length = 0  # length of the longest assignment stack seen when backtracking
+        self.phase_saving = True  # decisions reuse the saved phase of the variable
+        self.clause_activity_decay = 0.999
+        self.clause_activity_increment = 1.0
+        self.core_lbd = 2  # learned clauses with at most this LBD are never deleted
+        self.tier2_lbd = 6  # learned clauses with at most this LBD are kept as long as they are used
+        self.vivification_effort = 0.1  # literals propagated by vivification per literal propagated by the search
+        self.local_search_flips = 10000  # number of flips of one burst of local search
         self.positive_literal_counter = None
         self.negative_literal_counter = None
+        self.variable_activity = None  # array with `variable` as index and the best of its two literal counters as value
+        self.vsids_queue = None  # max-heap of variables ordered by `variable_activity`
+        self.final_conflict = []  # assumptions which made the last call of `cdcl` unsatisfiable
+        self.representative = {}  # dict: literal which replaces the substituted `key` literal in all clauses
+        self.activity_decay = 0.9
+        self.clause_minimization = 2  # `0` is none, `1` is self-subsuming, `2` is recursive minimization
+        self.minimized_literals = 0  # number of literals removed from learned clauses by minimization
+        self.activity_increment = 1.0  # grows by 1 / `activity_decay` instead of decaying every counter
+
+        self.variables = set(map(abs, self.arena.literals))
+        for variable in self.variables:
+            self.watched_lists[variable] = []
+            self.watched_lists[-variable] = []
+            self.binary_implications[variable] = []
+            self.binary_implications[-variable] = []
 
         for clause in self.clauses:
-            if clause.w1 == clause.w2:
-                self.unit_clauses_queue.append((clause, clause.literals[clause.w2]))
-
-            for literal in clause.literals:
-                variable = abs(literal)
-                self.variables.add(variable)
-
-                if variable not in self.watched_lists:
-                    self.watched_lists[variable] = []
+            self.attach_clause(clause)
 
-                if clause.literals[clause.w1] == literal or clause.literals[clause.w2] == literal:
-                    if clause not in self.watched_lists[variable]:
-                        self.watched_lists[variable].append(clause)
-
-        max_variable = max(self.variables)
+        max_variable = max(self.variables, default=0)
         self.assignment = [0] * (max_variable + 1)
-        self.antecedent = [None] * (max_variable + 1)
+        self.antecedent = [NO_CLAUSE] * (max_variable + 1)
         self.decision_level = [-1] * (max_variable + 1)
+        self.seen = [False] * (max_variable + 1)
+        self.saved_phase = [0] * (max_variable + 1)
+        self.best_phase = [0] * (max_variable + 1)
         self.positive_literal_counter = np.zeros((max_variable + 1), dtype=np.float64)
         self.negative_literal_counter = np.zeros((max_variable + 1), dtype=np.float64)
+        self.variable_activity = np.zeros((max_variable + 1), dtype=np.float64)
+        self.vsids_queue = VariableHeap(self.variable_activity, sorted(self.variables))
+
+        # unit clauses are put on the assignment stack straight away
+        for clause in self.clauses:
+            if self.arena.size[clause] == 1:
+                literal = self.arena.first_literal(clause)
+                if self.assignment[abs(literal)] == 0:
+                    self.assign_literal(literal, 0, clause)
+
+                elif self.assignment[abs(literal)] == -literal:
+                    self.root_conflict = clause
+
+            elif self.arena.size[clause] == 0:
+                self.root_conflict = clause
+
+    def attach_clause(self, clause: int) -> None:
+        """
+        Adds a binary clause to the implication lists of its two literals and a longer clause to the watched lists of
+        its first two literals. Unit clauses are not watched, they are assigned once and for all at decision level 0.
+        """
+        start = self.arena.start[clause]
+        if self.arena.size[clause] == 2:
+            first_literal = self.arena.literals[start]
+            second_literal = self.arena.literals[start + 1]
+            self.binary_implications[-first_literal].append((second_literal, clause))
+            self.binary_implications[-second_literal].append((first_literal, clause))
+
+        elif self.arena.size[clause] > 2:
+            self.watched_lists[self.arena.literals[start]].append(clause)
+            self.watched_lists[self.arena.literals[start + 1]].append(clause)
+
+    def add_root_clause(self, literals: Iterable[int], learned: bool = True, lbd: int = 0) -> None:
+        """
+        Adds a clause while the solver is at decision level 0. Literals false at that level are dropped and satisfied
+        clauses are skipped, a clause left with a single literal is assigned straight away and a clause left empty
+        becomes the root conflict.
+        """
+        if self.representative:
+            literals = [self.representative.get(literal, literal) for literal in literals]
+
+        remaining = []
+        for literal in literals:
+            value = self.assignment[abs(literal)]
+            if value == literal or -literal in remaining:
+                return
+
+            if value == 0 and literal not in remaining:
+                remaining.append(literal)
+
+        clause = self.arena.add(remaining, learned, min(lbd, len(remaining)))
+        if learned:
+            self.learned_clauses.append(clause)
+
+        else:
+            self.clauses.append(clause)
+
+        if not remaining:
+            self.root_conflict = clause
+
+        elif len(remaining) == 1:
+            self.assign_literal(remaining[0], 0, clause)
+
+        else:
+            self.attach_clause(clause)
+
+    def add_variables(self, max_variable: int) -> None:
+        """
+        Makes room for the variables up to `max_variable`, the new ones are added to the formula unassigned.
+        """
+        first_variable = len(self.assignment)
+        extra = max_variable + 1 - first_variable
+        if extra <= 0:
+            return
+
+        self.assignment.extend([0] * extra)
+        self.antecedent.extend([NO_CLAUSE] * extra)
+        self.decision_level.extend([-1] * extra)
+        self.seen.extend([False] * extra)
+        self.saved_phase.extend([0] * extra)
+        self.best_phase.extend([0] * extra)
+        self.positive_literal_counter = np.concatenate((self.positive_literal_counter, np.zeros(extra)))
+        self.negative_literal_counter = np.concatenate((self.negative_literal_counter, np.zeros(extra)))
+        self.variable_activity = np.concatenate((self.variable_activity, np.zeros(extra)))
+        self.vsids_queue.activity = self.variable_activity
+
+        for variable in range(first_variable, max_variable + 1):
+            self.variables.add(variable)
+            self.watched_lists[variable] = []
+            self.watched_lists[-variable] = []
+            self.binary_implications[variable] = []
+            self.binary_implications[-variable] = []
+            self.vsids_queue.insert(variable)
+
+    def watched_clauses(self, variable: int) -> Iterable[int]:
+        """
+        Iterates over the clauses watching either literal of the variable, binary clauses included.
+        """
+        return chain(self.watched_lists[variable], self.watched_lists[-variable],
+                     (clause for _, clause in self.binary_implications[-variable]),
+                     (clause for _, clause in self.binary_implications[variable]))
 
     def all_variables_assigned(self) -> bool:
         return len(self.variables) == len(self.assignment_stack)
 
-    def assign_literal(self, literal: int, decision_level: int) -> Tuple[bool, Optional[Clause]]:
+    def assign_literal(self, literal: int, decision_level: int, antecedent: int = NO_CLAUSE) -> None:
+        """
+        Assigns the literal and puts it on the assignment stack, it is propagated later by `unit_propagation`.
+        """
         self.assignment_stack.append(literal)
         self.assignment[abs(literal)] = literal
         self.decision_level[abs(literal)] = decision_level
+        self.antecedent[abs(literal)] = antecedent
 
-        watched_list = self.watched_lists[abs(literal)][:]
-
-
-        for clause in watched_list:
-            success, watched_literal, unit = clause.update_watched_literal(self.assignment, abs(literal))
-
-            # if not unsat
-            if success:
-                # if watched changed
-                if abs(watched_literal) != abs(literal):
-                    # add clause to watched list of new watched literal
-                    if clause not in self.watched_lists[abs(watched_literal)]:
-                        self.watched_lists[abs(watched_literal)].append(clause)
+    def propagate_literal(self, literal: int, decision_level: int) -> Optional[int]:
+        """
+        Updates the clauses watching the negation of the assigned literal and assigns the literals of the clauses
+        which became unit. Binary clauses are propagated first straight from the implication lists. For longer clauses
+        the watched literals are the first two literals of a clause, the falsified one is moved to the second place.
+        :return: the falsified clause if there is a conflict, otherwise None
+        """
+        false_literal = -literal
+        assignment = self.assignment
+
+        for implied_literal, clause in self.binary_implications[literal]:
+            if assignment[abs(implied_literal)] == 0:
+                self.assign_literal(implied_literal, decision_level, clause)
+
+            elif assignment[abs(implied_literal)] == -implied_literal:
+                return clause
+
+        literals = self.arena.literals
+        start = self.arena.start
+        size = self.arena.size
+
+        # only the clauses watching the falsified literal need to be visited
+        watched_list = self.watched_lists[false_literal]
+
+        # compact the watched list in place: clauses which found a new watched literal are dropped, the list itself
+        # does not grow since a new watched literal is never the falsified one
+        i = j = 0
+        watched_count = len(watched_list)
+        while i < watched_count:
+            clause = watched_list[i]
+            i += 1
+
+            first = start[clause]
+            if literals[first] == false_literal:
+                literals[first] = literals[first + 1]
+                literals[first + 1] = false_literal
+
+            # clause is satisfied by the other watched literal
+            other_literal = literals[first]
+            if assignment[abs(other_literal)] == other_literal:
+                watched_list[j] = clause
+                j += 1
+                continue
+
+            # look for a new literal to watch, which is not false
+            for index in range(first + 2, first + size[clause]):
+                new_literal = literals[index]
+                if assignment[abs(new_literal)] != -new_literal:
+                    literals[first + 1] = new_literal
+                    literals[index] = false_literal
+                    self.watched_lists[new_literal].append(clause)
+                    break
 
-                    # remove clause from watched list of old watched literal
-                    self.watched_lists[abs(literal)].remove(clause)
+            else:
+                watched_list[j] = clause
+                j += 1
 
-                # clause is unit then add the clause to the unit clauses queue
-                if unit:
-                    if clause.literals[clause.w2] not in [x[1] for x in self.unit_clauses_queue]:
-                        self.unit_clauses_queue.append((clause, clause.literals[clause.w2]))
+                # clause is unit then assign its last literal, the assignment itself marks it as enqueued
+                if assignment[abs(other_literal)] == 0:
+                    self.assign_literal(other_literal, decision_level, clause)
 
-            # clause is unsatisfied return False
-            if not success:
-                return False, clause
+                # clause is unsatisfied return it
+                else:
+                    watched_list[j:] = watched_list[i:]
+                    return clause
 
-        return True, None
+        del watched_list[j:]
+        return None
 
     def backtrack(self, decision_level: int) -> None:
         """
-        Backtrack to the given decision level by removing all the literals from the assignment stack
+        Backtrack to the given decision level by removing all the literals from the assignment stack,
+        their polarities are saved for the next decisions
         """
+        if len(self.assignment_stack) > self.best_assignment_length:
+            self.best_assignment_length = len(self.assignment_stack)
+            for literal in self.assignment_stack:
+                self.best_phase[abs(literal)] = literal
+
         while self.assignment_stack and self.decision_level[abs(self.assignment_stack[-1])] > decision_level:
             literal = self.assignment_stack.pop()
+            self.saved_phase[abs(literal)] = literal
             self.assignment[abs(literal)] = 0
-            self.antecedent[abs(literal)] = None
+            self.antecedent[abs(literal)] = NO_CLAUSE
             self.decision_level[abs(literal)] = -1
+            self.vsids_queue.insert(abs(literal))
+
+        self.propagation_head = min(self.propagation_head, len(self.assignment_stack))
 
-    @staticmethod
-    def resolve(clause1: list, clause2: list, literal: int) -> list:
-        in_clause1 = set(clause1)
-        in_clause2 = set(clause2)
-        in_clause1.remove(-literal)
-        in_clause2.remove(literal)
-        return list(in_clause1.union(in_clause2))
+    def bump_literal_activity(self, literal: int) -> None:
+        """
+        Decays every counter and then bumps the counter of the literal by one. Instead of multiplying all the counters
+        by `activity_decay`, the increment is divided by it, which keeps the same ordering in O(1). The counters are
+        rescaled once the increment gets too large to be stored in a float.
+        """
+        self.activity_increment /= self.activity_decay
+        variable = abs(literal)
+        if literal > 0:
+            self.positive_literal_counter[variable] += self.activity_increment
+
+        else:
+            self.negative_literal_counter[variable] += self.activity_increment
+
+        self.variable_activity[variable] = max(self.positive_literal_counter[variable],
+                                               self.negative_literal_counter[variable])
+        self.vsids_queue.increase(variable)
+
+        if self.activity_increment > 1e100:
+            self.positive_literal_counter *= 1e-100
+            self.negative_literal_counter *= 1e-100
+            self.variable_activity *= 1e-100
+            self.activity_increment *= 1e-100
 
-    def conflict_analysis(self, antecedent_of_conflict: Clause, decision_level: int) -> int:
+    def bump_clause_activity(self, clause: int) -> None:
+        """
+        Bumps the activity of a learned clause used in conflict analysis and lowers its LBD if it got better, so it
+        can move up to a better tier.
+        """
+        self.arena.activity[clause] += self.clause_activity_increment
+        self.arena.used[clause] = True
+        if self.arena.lbd[clause] > self.core_lbd:
+            lbd = len({self.decision_level[abs(literal)] for literal in self.arena.clause_literals(clause)})
+            if lbd < self.arena.lbd[clause]:
+                self.arena.lbd[clause] = lbd
+
+        if self.arena.activity[clause] > 1e20:
+            for learned_clause in self.learned_clauses:
+                self.arena.activity[learned_clause] *= 1e-20
+            self.clause_activity_increment *= 1e-20
+
+    def decay_clause_activity(self) -> None:
+        self.clause_activity_increment /= self.clause_activity_decay
+
+    def conflict_analysis(self, antecedent_of_conflict: int, decision_level: int) -> Tuple[int, Optional[int]]:
+        """
+        Learns the first UIP clause of the conflict by walking the assignment stack backwards once. The variables
+        already resolved on are marked in `seen` and only the literals of the current decision level are counted,
+        the resolution stops when a single one of them is left.
+        :return: the level to backtrack to and the learned clause, whose first literal has to be assigned after
+                 backtracking
+        """
         # conflict at decision level 0, return -1
         if decision_level == 0:
-            return -1
-
-        # find literals of assertive clause
-        assertive_clause_literals = antecedent_of_conflict.literals
-        current_assignment = deque(self.assignment_stack)
-        while len([l for l in assertive_clause_literals if self.decision_level[abs(l)] == decision_level]) > 1:
-            while True:
-                literal = current_assignment.pop()
-                if -literal in assertive_clause_literals:
-                    assertive_clause_literals = self.resolve(assertive_clause_literals,
-                                                             self.antecedent[abs(literal)].literals, literal)
-                    break
+            return -1, None
+
+        # find literals of assertive clause, the first place is kept for the UIP literal
+        assertive_clause_literals = [0]
+        current_level_literals = 0
+        clause = antecedent_of_conflict
+        literal = 0
+        index = len(self.assignment_stack) - 1
+        while True:
+            if self.arena.learned[clause]:
+                self.bump_clause_activity(clause)
+
+            for clause_literal in self.arena.clause_literals(clause):
+                variable = abs(clause_literal)
+                if clause_literal == literal or self.seen[variable] or self.decision_level[variable] == 0:
+                    continue
 
+                self.seen[variable] = True
+                if self.decision_level[variable] == decision_level:
+                    current_level_literals += 1
+
+                else:
+                    assertive_clause_literals.append(clause_literal)
+
+            # next literal of the current decision level to resolve on
+            while not self.seen[abs(self.assignment_stack[index])]:
+                index -= 1
+
+            literal = self.assignment_stack[index]
+            index -= 1
+            self.seen[abs(literal)] = False
+            current_level_literals -= 1
+            if current_level_literals == 0:
+                break
+
+            clause = self.antecedent[abs(literal)]
+
+        assertive_clause_literals[0] = -literal
+
+        # minimize the assertive clause while its literals are still marked as seen
+        marked_literals = assertive_clause_literals[1:]
+        if self.clause_minimization:
+            assertive_clause_literals = self.minimize_clause(assertive_clause_literals, marked_literals)
+
+        for literal in marked_literals:
+            self.seen[abs(literal)] = False
+
+        # the second watched literal is the one with the highest decision level, which is the assertion level
         assertion_level = 0
-        unit_literal = None
-        w2 = None
-        decision_level_present = [False] * (decision_level + 1)
-        for index, literal in enumerate(assertive_clause_literals):
-            if assertion_level < self.decision_level[abs(literal)] < decision_level:
-                assertion_level = self.decision_level[abs(literal)]
-
-            if self.decision_level[abs(literal)] == decision_level:
-                unit_literal = literal
-                w2 = index
-
-            if not decision_level_present[self.decision_level[abs(literal)]]:
-                decision_level_present[self.decision_level[abs(literal)]] = True
-
-            self.positive_literal_counter = self.positive_literal_counter * 0.9
-            self.negative_literal_counter = self.negative_literal_counter * 0.9
-            if literal > 0:
-                self.positive_literal_counter[literal] += 1
+        second_watched = 0
+        for index in range(1, len(assertive_clause_literals)):
+            variable = abs(assertive_clause_literals[index])
+            if self.decision_level[variable] > assertion_level:
+                assertion_level = self.decision_level[variable]
+                second_watched = index
 
-            else:
-                self.negative_literal_counter[(abs(literal))] += 1
+        if second_watched:
+            assertive_clause_literals[1], assertive_clause_literals[second_watched] = (
+                assertive_clause_literals[second_watched], assertive_clause_literals[1])
 
         # get lbd of assertive clause
-        lbd = sum(decision_level_present)
-
-        # get the second watched literal
-        w1 = None
-        if len(assertive_clause_literals) > 1:
-            current_assignment = deque(self.assignment_stack)
-            found = False
-            while current_assignment:
-                literal = current_assignment.pop()
-                if self.decision_level[abs(literal)] == assertion_level:
-                    for index, clause_literal in enumerate(assertive_clause_literals):
-                        if abs(literal) == abs(clause_literal):
-                            w1 = index
-                            found = True
-                            break
-                if found:
-                    break
-        else:
-            w1 = w2
+        lbd = len({self.decision_level[abs(literal)] for literal in assertive_clause_literals})
+
+        for literal in assertive_clause_literals:
+            self.bump_literal_activity(literal)
+
+        self.decay_clause_activity()
 
         # create then update
-        assertive_clause = Clause(assertive_clause_literals, w1=w1, w2=w2, learned=True, lbd=lbd)
-        self.watched_lists[abs(assertive_clause.literals[assertive_clause.w1])].append(assertive_clause)
-        if assertive_clause.w1 != assertive_clause.w2:
-            self.watched_lists[abs(assertive_clause.literals[assertive_clause.w2])].append(assertive_clause)
+        assertive_clause = self.arena.add(assertive_clause_literals, learned=True, lbd=lbd)
+        self.attach_clause(assertive_clause)
 
         # add to learned clauses
         self.learned_clauses.append(assertive_clause)
 
-        self.unit_clauses_queue.clear()
-        self.unit_clauses_queue.append((assertive_clause, unit_literal))
+        return assertion_level, assertive_clause
+
+    def analyze_final(self, literal: int) -> list:
+        """
+        Finds the assumptions which imply the negation of the given assumption, by following the antecedents back
+        from it to the decisions, which are the assumptions themselves.
+        :return: the given assumption and the ones responsible for its negation
+        """
+        final_conflict = [literal]
+        if self.decision_level[abs(literal)] == 0:
+            return final_conflict
+
+        self.seen[abs(literal)] = True
+        for assigned_literal in reversed(self.assignment_stack):
+            variable = abs(assigned_literal)
+            if self.decision_level[variable] == 0:
+                break
+
+            if self.seen[variable]:
+                self.seen[variable] = False
+                if self.antecedent[variable] == NO_CLAUSE:
+                    final_conflict.append(assigned_literal)
+
+                else:
+                    for other in self.arena.clause_literals(self.antecedent[variable]):
+                        if abs(other) != variable and self.decision_level[abs(other)] > 0:
+                            self.seen[abs(other)] = True
+
+        return final_conflict
+
+    def minimize_clause(self, clause_literals: list, marked_literals: list) -> list:
+        """
+        Removes the literals of the learned clause which are implied by the other ones. With `clause_minimization`
+        set to 1 a literal is removed only if its antecedent is subsumed by the clause (self-subsuming resolution),
+        with 2 the implication graph is followed recursively. Variables visited by the recursive check are appended to
+        `marked_literals` so the caller can clear their seen flag.
+        :return: the minimized clause, with the UIP literal still in the first place
+        """
+        # bit mask of the decision levels in the clause, to cut the recursive search early
+        abstract_levels = 0
+        for literal in clause_literals[1:]:
+            abstract_levels |= 1 << (self.decision_level[abs(literal)] & 31)
+
+        minimized_literals = [clause_literals[0]]
+        for literal in clause_literals[1:]:
+            antecedent = self.antecedent[abs(literal)]
+            if antecedent == NO_CLAUSE:
+                minimized_literals.append(literal)
+
+            elif self.clause_minimization == 1:
+                for antecedent_literal in self.arena.clause_literals(antecedent):
+                    variable = abs(antecedent_literal)
+                    if not self.seen[variable] and self.decision_level[variable] > 0:
+                        minimized_literals.append(literal)
+                        break
+
+            elif not self.literal_redundant(literal, abstract_levels, marked_literals):
+                minimized_literals.append(literal)
+
+        self.minimized_literals += len(clause_literals) - len(minimized_literals)
+        return minimized_literals
+
+    def literal_redundant(self, literal: int, abstract_levels: int, marked_literals: list) -> bool:
+        """
+        Checks whether the literal is implied by the learned clause by following the antecedents depth first.
+        Every visited variable which turns out to be implied is marked as seen, so it is not visited again.
+        """
+        stack = [literal]
+        first_marked = len(marked_literals)
+        while stack:
+            implied_variable = abs(stack.pop())
+            for antecedent_literal in self.arena.clause_literals(self.antecedent[implied_variable]):
+                variable = abs(antecedent_literal)
+                if variable == implied_variable or self.seen[variable] or self.decision_level[variable] == 0:
+                    continue
+
+                if (self.antecedent[variable] != NO_CLAUSE and
+                        (1 << (self.decision_level[variable] & 31)) & abstract_levels):
+                    self.seen[variable] = True
+                    stack.append(antecedent_literal)
+                    marked_literals.append(antecedent_literal)
 
-        return assertion_level
+                else:
+                    for marked_literal in marked_literals[first_marked:]:
+                        self.seen[abs(marked_literal)] = False
+                    del marked_literals[first_marked:]
+                    return False
 
-    def unit_propagation(self, decision_level: int) -> Tuple[list, Optional[Clause]]:
+        return True
+
+    def unit_propagation(self, decision_level: int) -> Tuple[list, Optional[int]]:
         """
-        Unit propagation algorithm
+        Unit propagation algorithm, propagates every literal of the assignment stack from `propagation_head` on.
         """
-        propagated_literals = []
-        while self.unit_clauses_queue:
-            unit_clause, unit_clause_literal = self.unit_clauses_queue.popleft()
-            propagated_literals.append(unit_clause_literal)
-            self.antecedent[abs(unit_clause_literal)] = unit_clause
+        if self.root_conflict is not None:
+            return [], self.root_conflict
 
-            success, antecedent_of_conflict = self.assign_literal(unit_clause_literal, decision_level)
-            if not success:
-                return propagated_literals, antecedent_of_conflict
+        first_propagated = len(self.assignment_stack)
+        while self.propagation_head < len(self.assignment_stack):
+            literal = self.assignment_stack[self.propagation_head]
+            self.propagation_head += 1
 
-        return propagated_literals, None  
-    
+            antecedent_of_conflict = self.propagate_literal(literal, decision_level)
+            if antecedent_of_conflict is not None:
+                # remembered for the next calls of incremental solving, as the literal is propagated only once
+                if decision_level == 0:
+                    self.root_conflict = antecedent_of_conflict
+
+                return self.assignment_stack[first_propagated:], antecedent_of_conflict
+
+        return self.assignment_stack[first_propagated:], None
 
     def pick_branching_variable(self, heuristic: int) -> int:
         """
-        Picks a branching variable based on the given heuristic
+        Picks a branching variable based on the given heuristic, with phase saving its polarity is the one it had
+        when it was last unassigned
         """
         if heuristic == 0:
-            return self.two_clause_heuristic()
+            decision_literal = self.two_clause_heuristic()
+
+        elif heuristic == 1:
+            decision_literal = self.vsids_heuristic()
+
+        elif heuristic == 2:
+            decision_literal = self.unassigned_heuristic()
+
+        elif heuristic == 3:
+            decision_literal = self.random_heuristic()
+
+        else:
+            decision_literal = self.jeroslow_wang_heuristic()
+
+        if self.phase_saving and self.saved_phase[abs(decision_literal)]:
+            return self.saved_phase[abs(decision_literal)]
+
+        return decision_literal
 
-        if heuristic == 1:
-            return self.vsids_heuristic()
-        
-        if heuristic == 2:
-            return self.unassigned_heuristic()
-        
-        if heuristic == 3:
-            return self.random_heuristic()
-        
-        if heuristic == 4:
-            return self.jeroslow_wang_heuristic()
-        
 ### Heuristics
     def unassigned_heuristic(self) -> int:
         """
@@ -280,9 +681,9 @@ class CNF:
             if self.assignment[variable] == 0:
                 positive_clauses = 0
                 negative_clauses = 0
-                for clause in self.watched_lists[variable]:
-                    if not clause.is_satisfied(self.assignment):
-                        unassigned = clause.partial_assignment(self.assignment)
+                for clause in self.watched_clauses(variable):
+                    if not self.arena.is_satisfied(clause, self.assignment):
+                        unassigned = self.arena.partial_assignment(clause, self.assignment)
                         if variable in unassigned:
                             positive_clauses += 1
 
@@ -309,13 +710,14 @@ class CNF:
                 # positive_clauses = 0
                 # negative_clauses = 0
                 
-                for clause in self.watched_lists[variable]:
-                    clause_length = len(clause.literals)
+                for clause in self.watched_clauses(variable):
+                    clause_length = self.arena.size[clause]
                     curr_score += 2**(-clause_length)
-                    
-                    if curr_score > max_j_score:
-                        max_j_score = curr_score
-                        decision_literal = variable
+
+                # also reached by variables without clauses, which only exist in incremental solving
+                if curr_score > max_j_score:
+                    max_j_score = curr_score
+                    decision_literal = variable
                     
                 #     if not clause.is_satisfied(self.assignment):
                 #         unassigned = clause.partial_assignment(self.assignment)
@@ -337,22 +739,18 @@ class CNF:
     def vsids_heuristic(self) -> int:
         """
         Finds the unassigned literal based on VSIDS heuristic, i.e. the literal which is present the most in the
-        learned clauses (when a clause is added).
+        learned clauses (when a clause is added). Variables are kept in a max-heap ordered by activity, the assigned
+        ones are discarded lazily when they reach the top.
         :return: the decision literal
         """
-        decision_literal = None
-        best_counter = 0
-        for variable in self.variables:
-            if self.assignment[variable] == 0:
-                if self.positive_literal_counter[variable] > best_counter:
-                    decision_literal = variable
-                    best_counter = self.positive_literal_counter[variable]
+        variable = self.vsids_queue.remove_max()
+        while self.assignment[variable] != 0:
+            variable = self.vsids_queue.remove_max()
 
-                if self.negative_literal_counter[variable] >= best_counter:
-                    decision_literal = -variable
-                    best_counter = self.negative_literal_counter[variable]
+        if self.positive_literal_counter[variable] > self.negative_literal_counter[variable]:
+            return variable
 
-        return decision_literal
+        return -variable
 
     def random_heuristic(self) -> int:
         """
@@ -386,9 +784,9 @@ class CNF:
                 unassigned_literals.append(variable)
                 positive_clauses = 0
                 negative_clauses = 0
-                for clause in self.watched_lists[variable]:
-                    if not clause.is_satisfied(self.assignment) and clause.size == 2:
-                        unassigned = clause.partial_assignment(self.assignment)
+                for clause in self.watched_clauses(variable):
+                    if not self.arena.is_satisfied(clause, self.assignment) and self.arena.size[clause] == 2:
+                        unassigned = self.arena.partial_assignment(clause, self.assignment)
                         if variable in unassigned:
                             positive_clauses += 1
 
@@ -415,27 +813,272 @@ class CNF:
 ######
         
 
-    def delete_learned_clauses_by_lbd(self, lbd_limit: float) -> None:
+    def is_reason(self, clause: int) -> bool:
         """
-        Deletes the learned clauses with LBD greater than the given limit.
+        Checks whether the clause is the antecedent of one of the current assignments, the implied literal is always
+        one of the watched literals.
         """
+        start = self.arena.start[clause]
+        return (self.antecedent[abs(self.arena.literals[start])] == clause or
+                (self.arena.size[clause] > 1 and self.antecedent[abs(self.arena.literals[start + 1])] == clause))
 
-        lbd_limit = int(lbd_limit)
+    def reduce_learned_clauses(self) -> None:
+        """
+        Deletes half of the learned clauses which are worth the least. Clauses with LBD up to `core_lbd` are always
+        kept, clauses with LBD up to `tier2_lbd` are kept if they were used since the last reduction, the remaining
+        ones are sorted by activity. Clauses which are antecedents of current assignments are never deleted.
+        The deleted clauses are swept from all watched lists at once.
+        """
         new_learned_clauses = []
+        candidates = []
         for clause in self.learned_clauses:
-            if clause.lbd > lbd_limit:
-                self.watched_lists[abs(clause.literals[clause.w1])].remove(clause)
-                if clause.w1 != clause.w2:
-                    self.watched_lists[abs(clause.literals[clause.w2])].remove(clause)
+            lbd = self.arena.lbd[clause]
+            if lbd <= self.core_lbd or (lbd <= self.tier2_lbd and self.arena.used[clause]) or self.is_reason(clause):
+                new_learned_clauses.append(clause)
 
             else:
-                new_learned_clauses.append(clause)
+                candidates.append(clause)
+
+            self.arena.used[clause] = False
 
+        candidates.sort(key=lambda clause: self.arena.activity[clause])
+        for clause in candidates[:len(candidates) // 2]:
+            self.arena.delete(clause)
+
+        new_learned_clauses.extend(candidates[len(candidates) // 2:])
         self.learned_clauses = new_learned_clauses
+        self.sweep_deleted_clauses()
+
+    def vivify_learned_clauses(self, budget: int) -> int:
+        """
+        Inprocessing at decision level 0: the negations of the literals of a learned clause are assigned one at a
+        time and propagated. A literal which becomes false is dropped from the clause, and a literal which becomes
+        true or a conflict ends it early, so the clause is replaced by a shorter one. A clause whose true literal
+        was implied by other clauses is redundant and deleted. The tier-2 clauses are tried once each, by increasing
+        LBD and decreasing activity, until `budget` literals have been propagated.
+        :return: the number of propagated literals
+        """
+        arena = self.arena
+        propagated_literals, antecedent_of_conflict = self.unit_propagation(0)
+        steps = len(propagated_literals)
+        if antecedent_of_conflict is not None:
+            return steps
+
+        candidates = [clause for clause in self.learned_clauses
+                      if arena.size[clause] > 2 and arena.lbd[clause] <= self.tier2_lbd and not arena.vivified[clause]]
+        candidates.sort(key=lambda clause: (arena.lbd[clause], -arena.activity[clause]))
+
+        # the trial assignments must not change the phases used by the search
+        saved_phase = list(self.saved_phase)
+        best_phase = list(self.best_phase)
+        best_assignment_length = self.best_assignment_length
+
+        changed = False
+        for clause in candidates:
+            if steps >= budget or self.root_conflict is not None:
+                break
+
+            literals = list(arena.clause_literals(clause))
+            if any(self.assignment[abs(literal)] == literal for literal in literals):
+                if not self.is_reason(clause):
+                    arena.delete(clause)
+                    changed = True
+                continue
+
+            kept = []
+            redundant = False
+            for literal in literals:
+                value = self.assignment[abs(literal)]
+                if value == -literal:
+                    continue
+
+                if value == literal:
+                    kept.append(literal)
+                    redundant = self.antecedent[abs(literal)] != clause
+                    break
+
+                if steps >= budget:
+                    kept = None
+                    break
+
+                kept.append(literal)
+                self.assign_literal(-literal, 1)
+                propagated_literals, antecedent_of_conflict = self.unit_propagation(1)
+                steps += len(propagated_literals)
+                if antecedent_of_conflict is not None:
+                    break
+
+            self.backtrack(0)
+            if kept is None:
+                break
+
+            arena.vivified[clause] = True
+            if len(kept) < len(literals):
+                arena.delete(clause)
+                self.add_root_clause(kept, learned=True, lbd=arena.lbd[clause])
+                arena.vivified[self.learned_clauses[-1]] = True
+                propagated_literals, _ = self.unit_propagation(0)
+                steps += len(propagated_literals)
+                changed = True
+
+            elif redundant:
+                arena.delete(clause)
+                changed = True
+
+        self.saved_phase = saved_phase
+        self.best_phase = best_phase
+        self.best_assignment_length = best_assignment_length
+
+        if changed:
+            self.sweep_deleted_clauses()
+
+        return steps
+
+    def sweep_deleted_clauses(self) -> None:
+        """
+        Drops the deleted clauses from the clause lists, the watched lists and the implication lists, and compacts
+        the arena once half of its literals belong to deleted clauses.
+        """
+        deleted = self.arena.deleted
+        self.clauses = [clause for clause in self.clauses if not deleted[clause]]
+        self.learned_clauses = [clause for clause in self.learned_clauses if not deleted[clause]]
+        for watched_list in self.watched_lists.values():
+            watched_list[:] = [clause for clause in watched_list if not deleted[clause]]
+
+        for implications in self.binary_implications.values():
+            implications[:] = [(implied_literal, clause) for implied_literal, clause in implications
+                               if not deleted[clause]]
+
+        if self.arena.wasted * 2 > len(self.arena.literals):
+            self.collect_garbage()
+
+    def collect_garbage(self) -> None:
+        """
+        Compacts the clause arena and updates every clause reference held by the solver.
+        """
+        relocation = self.arena.collect_garbage()
+        self.clauses = [relocation[clause] for clause in self.clauses]
+        self.learned_clauses = [relocation[clause] for clause in self.learned_clauses]
+        for watched_list in self.watched_lists.values():
+            watched_list[:] = [relocation[clause] for clause in watched_list]
+
+        for implications in self.binary_implications.values():
+            implications[:] = [(implied_literal, relocation[clause]) for implied_literal, clause in implications]
+
+        for variable, antecedent in enumerate(self.antecedent):
+            if antecedent != NO_CLAUSE:
+                self.antecedent[variable] = relocation[antecedent]
+
+    def randomize_activity(self, seed: int, noise: float = 1e-3) -> None:
+        """
+        Adds a small random amount to the literal counters, so that solvers started with different seeds break the
+        ties of VSIDS differently. The noise stays below the first bump, so it never outweighs a real conflict.
+        """
+        generator = np.random.default_rng(seed)
+        self.positive_literal_counter += generator.random(len(self.positive_literal_counter)) * noise
+        self.negative_literal_counter += generator.random(len(self.negative_literal_counter)) * noise
+        np.maximum(self.positive_literal_counter, self.negative_literal_counter, out=self.variable_activity)
+        self.vsids_queue = VariableHeap(self.variable_activity, sorted(self.variables))
+
+    def substitute_equivalent_literals(self) -> None:
+        """
+        Inprocessing at decision level 0: finds the classes of equivalent literals in the binary implication graph
+        and replaces every literal by the representative of its class in all the clauses. The substituted variables
+        leave the formula, `model` gives them the value of their representative.
+        """
+        def implications(literal):
+            return [implied for implied, clause in self.binary_implications[literal]
+                    if not self.arena.deleted[clause] and self.assignment[abs(implied)] == 0]
+
+        literals = [literal for variable in self.variables if self.assignment[variable] == 0
+                    for literal in (variable, -variable)]
+        representatives = equivalent_literals(literals, implications)
+        if representatives is None:
+            self.add_root_clause([], learned=False)
+            return
+
+        if not representatives:
+            return
+
+        # earlier substitutions now point to the new representative
+        for literal, representative in self.representative.items():
+            self.representative[literal] = representatives.get(representative, representative)
+
+        self.representative.update(representatives)
+        for literal in representatives:
+            if literal > 0:
+                self.variables.discard(literal)
+                self.vsids_queue.remove(literal)
+
+        for clause in self.clauses + self.learned_clauses:
+            literals = self.arena.clause_literals(clause)
+            if any(literal in representatives for literal in literals):
+                self.arena.delete(clause)
+                self.add_root_clause(list(literals), bool(self.arena.learned[clause]), self.arena.lbd[clause])
+
+        self.sweep_deleted_clauses()
+
+    def local_search_burst(self, algorithm: str, phases: Sequence[int], assumptions: Sequence[int] = ()) -> Optional[list]:
+        """
+        Runs `local_search_flips` flips of local search at decision level 0, starting from the given phases. The
+        search works on the assumptions and the original clauses, without the ones satisfied at that level and without
+        their false literals. The best assignment it reaches becomes the saved phases of the unassigned variables.
+        :return: the complete assignment if the search found a model, as a list with `variable` as index and its true
+        literal as value, otherwise None
+        """
+        assignment = self.assignment
+        clauses = []
+        for literals in chain(([literal] for literal in assumptions),
+                              (self.arena.clause_literals(clause) for clause in self.clauses)):
+            if not any(assignment[abs(literal)] == literal for literal in literals):
+                clauses.append([literal for literal in literals if assignment[abs(literal)] == 0])
+
+        searcher = LocalSearch(clauses, len(assignment) - 1, random.randrange(1 << 30), phases)
+        found = LOCAL_SEARCH_ALGORITHMS[algorithm](searcher, self.local_search_flips)
+        for variable in self.variables:
+            if assignment[variable] == 0:
+                self.saved_phase[variable] = searcher.best_assignment[variable]
+
+        if not found:
+            return None
+
+        return [value or searcher.assignment[variable] for variable, value in enumerate(assignment)]
+
+    def model(self, assignment: Optional[list] = None) -> list:
+        """
+        :param assignment: complete assignment to read the values from, the current one if None
+        :return: the assignment as a list of literals, including the substituted variables
+        """
+        if assignment is None:
+            model = list(self.assignment_stack)
+            assignment = self.assignment
+
+        else:
+            model = [assignment[variable] for variable in self.variables]
+
+        for literal, representative in self.representative.items():
+            if literal > 0:
+                model.append(literal if assignment[abs(representative)] == representative else -literal)
+
+        return model
 
     def restart(self) -> None:
         """
-        Restarts the solver by clearing the unit clauses queue and backtracking to the root level.
+        Restarts the solver by backtracking to the root level.
         """
-        self.unit_clauses_queue.clear()
         self.backtrack(decision_level=0)
+
+    def rephase(self, mode: str) -> None:
+        """
+        Resets the saved phases: `best` to the polarities of the longest assignment seen so far, `original` back to
+        the polarities chosen by the heuristics and `inverted` to the opposite of the current saved phases.
+        """
+        if mode == "best":
+            self.saved_phase = list(self.best_phase)
+            self.best_assignment_length = 0
+
+        elif mode == "original":
+            self.saved_phase = [0] * len(self.saved_phase)
+
+        elif mode == "inverted":
+            self.saved_phase = [-literal for literal in self.saved_phase]
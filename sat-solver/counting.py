@@ -0,0 +1,150 @@
+from collections import Counter
+from typing import Iterable, Optional
+
+
+def condition(clauses: list, literal: int) -> Optional[list]:
+    """
+    Simplifies the clauses with the literal set to true: satisfied clauses are dropped and the negation of the literal
+    is removed from the others.
+    :return: the simplified clauses, or None if one of them became empty
+    """
+    simplified = []
+    for clause in clauses:
+        if literal in clause:
+            continue
+
+        if -literal in clause:
+            clause = tuple(other for other in clause if other != -literal)
+            if not clause:
+                return None
+
+        simplified.append(clause)
+
+    return simplified
+
+
+def propagate_units(clauses: list) -> tuple:
+    """
+    Sets the literals of the unit clauses to true until there are none left.
+    :return: tuple of the simplified clauses (None on a conflict) and the set of assigned variables
+    """
+    assigned = set()
+    while clauses:
+        unit = next((clause[0] for clause in clauses if len(clause) == 1), None)
+        if unit is None:
+            break
+
+        assigned.add(abs(unit))
+        clauses = condition(clauses, unit)
+        if clauses is None:
+            break
+
+    return clauses, assigned
+
+
+def components(clauses: list) -> list:
+    """
+    Splits the clauses into groups which share no variable, with a union-find over the variables.
+    :return: list of (clauses, variables) pairs
+    """
+    parent = {}
+
+    def find(variable):
+        while parent[variable] != variable:
+            parent[variable] = parent[parent[variable]]
+            variable = parent[variable]
+        return variable
+
+    for clause in clauses:
+        root = None
+        for literal in clause:
+            variable = abs(literal)
+            parent.setdefault(variable, variable)
+            if root is None:
+                root = find(variable)
+
+            else:
+                other_root = find(variable)
+                if other_root != root:
+                    parent[other_root] = root
+
+    groups = {}
+    for clause in clauses:
+        groups.setdefault(find(abs(clause[0])), []).append(clause)
+
+    return [(group, {abs(literal) for clause in group for literal in clause}) for group in groups.values()]
+
+
+class ModelCounter:
+    """
+    Exact model counter (#SAT): DPLL with unit propagation which splits the formula into independent components,
+    whose counts multiply, and caches the count of every component it solved, keyed by its set of clauses.
+    """
+
+    def __init__(self):
+        self.cache = {}  # dict: number of models of the component with `key` set of clauses over its variables
+        self.cache_hits = 0
+        self.decisions = 0
+
+    def count(self, clauses: Iterable[Iterable[int]], num_variables: int) -> int:
+        """
+        Counts the models of the clauses over the variables 1 to `num_variables`.
+        """
+        normalized = []
+        for clause in clauses:
+            clause = tuple(sorted(set(clause)))
+            # an empty clause holds in no model
+            if not clause:
+                return 0
+
+            # tautologies hold in every model
+            if not any(-literal in clause for literal in clause):
+                normalized.append(clause)
+
+        return self.count_clauses(normalized, set(range(1, num_variables + 1)))
+
+    def count_clauses(self, clauses: list, variables: set) -> int:
+        """
+        Counts the models of the clauses over the given variables, which include the ones of the clauses.
+        """
+        clauses, assigned = propagate_units(clauses)
+        if clauses is None:
+            return 0
+
+        # variables left out of every clause can take both values
+        used = {abs(literal) for clause in clauses for literal in clause}
+        result = 1 << (len(variables) - len(assigned) - len(used))
+
+        for component_clauses, component_variables in components(clauses):
+            result *= self.count_component(component_clauses, component_variables)
+            if result == 0:
+                break
+
+        return result
+
+    def count_component(self, clauses: list, variables: set) -> int:
+        key = frozenset(clauses)
+        if key in self.cache:
+            self.cache_hits += 1
+            return self.cache[key]
+
+        # branch on the variable occurring the most
+        occurrences = Counter(abs(literal) for clause in clauses for literal in clause)
+        variable = occurrences.most_common(1)[0][0]
+        self.decisions += 1
+
+        result = 0
+        for literal in (variable, -variable):
+            conditioned = condition(clauses, literal)
+            if conditioned is not None:
+                result += self.count_clauses(conditioned, variables - {variable})
+
+        self.cache[key] = result
+        return result
+
+
+def count_models(clauses: Iterable[Iterable[int]], num_variables: int) -> int:
+    """
+    Counts the models of the formula over the variables 1 to `num_variables`, see `ModelCounter`.
+    """
+    return ModelCounter().count(clauses, num_variables)
@@ -0,0 +1,143 @@
+import multiprocessing
+import time
+from functools import partial
+from typing import Optional
+
+import numpy as np
+
+import cdcl
+from cnf import CNF
+from dimacs import read_dimacs
+
+# solver of the worker process, built once by `load_formula` and reused for all its cubes
+worker_formula = None
+
+
+def lookahead(cnf_formula: CNF, literal: int, decision_level: int) -> Optional[int]:
+    """
+    Assigns the literal at the given decision level, propagates it and undoes the assignment again.
+    :return: the number of propagated literals, or None if the literal failed, i.e. led to a conflict
+    """
+    cnf_formula.assign_literal(literal, decision_level)
+    propagated_literals, antecedent_of_conflict = cnf_formula.unit_propagation(decision_level)
+    cnf_formula.backtrack(decision_level - 1)
+
+    if antecedent_of_conflict is not None:
+        return None
+
+    return len(propagated_literals)
+
+
+def pick_split_variable(cnf_formula: CNF, occurrences: np.ndarray, decision_level: int, candidates: int) -> int:
+    """
+    Looks ahead on both literals of the `candidates` unassigned variables occurring the most and returns the one
+    whose two branches propagate the most literals (product of both counts). A variable with a failed literal is
+    returned straight away as only one of its branches needs to be solved.
+    :return: the split variable, or 0 if every variable is assigned
+    """
+    unassigned = [variable for variable in cnf_formula.variables if cnf_formula.assignment[variable] == 0]
+    unassigned.sort(key=lambda variable: occurrences[variable], reverse=True)
+
+    best_variable = 0
+    best_score = -1
+    for variable in unassigned[:candidates]:
+        positive = lookahead(cnf_formula, variable, decision_level + 1)
+        negative = lookahead(cnf_formula, -variable, decision_level + 1)
+        if positive is None or negative is None:
+            return variable
+
+        score = (positive + 1) * (negative + 1)
+        if score > best_score:
+            best_variable = variable
+            best_score = score
+
+    return best_variable
+
+
+def split(cnf_formula: CNF, occurrences: np.ndarray, cube: list, depth: int, candidates: int, cubes: list) -> None:
+    """
+    Splits the formula under the cube, whose literals are assigned one per decision level, into at most
+    `2 ** depth` cubes. Branches which lead to a conflict are refuted by the lookahead itself and dropped.
+    """
+    split_variable = pick_split_variable(cnf_formula, occurrences, len(cube), candidates) if depth > 0 else 0
+    if split_variable == 0:
+        cubes.append(cube)
+        return
+
+    decision_level = len(cube) + 1
+    for literal in (split_variable, -split_variable):
+        cnf_formula.assign_literal(literal, decision_level)
+        _, antecedent_of_conflict = cnf_formula.unit_propagation(decision_level)
+        if antecedent_of_conflict is None:
+            split(cnf_formula, occurrences, cube + [literal], depth - 1, candidates, cubes)
+
+        cnf_formula.backtrack(decision_level - 1)
+
+
+def make_cubes(literals, depth: int, candidates: int = 20) -> list:
+    """
+    Splits the formula given as a flat zero-terminated array of literals into cubes by lookahead.
+    :return: list of cubes, i.e. lists of literals, the formula is unsatisfiable if it is empty
+    """
+    cnf_formula = CNF(literals)
+    _, antecedent_of_conflict = cnf_formula.unit_propagation(0)
+    if antecedent_of_conflict is not None:
+        return []
+
+    occurrences = np.bincount(np.abs(np.frombuffer(cnf_formula.arena.literals, dtype=np.int32)),
+                              minlength=len(cnf_formula.assignment))
+    cubes = []
+    split(cnf_formula, occurrences, [], depth, candidates, cubes)
+
+    return cubes
+
+
+def load_formula(literals) -> None:
+    global worker_formula
+    worker_formula = CNF(literals)
+
+
+def solve_cube(cube: list, options: dict) -> tuple:
+    """
+    Solves the formula of the worker process under the literals of the cube as assumptions. The clauses learned
+    on the previous cubes of the worker are kept.
+    :return: tuple of the cube, sat, model, cpu time, decisions, unit propagations and restarts
+    """
+    return (cube,) + cdcl.solve_formula(worker_formula, assumptions=cube, **options)
+
+
+def run_cube_and_conquer(input_file: str, depth: int, jobs: Optional[int] = None, timeout: Optional[float] = None,
+                         **options) -> Optional[tuple]:
+    """
+    Cube and conquer: the formula is split into cubes by lookahead (`make_cubes`) and the cubes are solved in `jobs`
+    worker processes. The formula is satisfiable as soon as one cube is, and unsatisfiable once every cube is refuted.
+    The `options` are passed to every solver, see `cdcl.solve_formula`.
+    :return: tuple of sat, model, the number of cubes, the wall-clock time and the decisions, unit propagations and
+    restarts summed over the solved cubes, or None if the cubes were not solved within `timeout` seconds
+    """
+    start_time = time.time()
+    literals = read_dimacs(input_file).literals
+    cubes = make_cubes(literals, depth)
+
+    decisions = unit_propagations = restarts = 0
+    with multiprocessing.Pool(jobs, initializer=load_formula, initargs=(literals,)) as pool:
+        # leaving the block terminates the workers still busy with other cubes
+        results = pool.imap_unordered(partial(solve_cube, options=options), cubes)
+        for _ in cubes:
+            try:
+                if timeout is None:
+                    result = results.next()
+                else:
+                    result = results.next(timeout=max(0.0, start_time + timeout - time.time()))
+
+            except multiprocessing.TimeoutError:
+                return None
+
+            _, sat, model, _, cube_decisions, cube_propagations, cube_restarts = result
+            decisions += cube_decisions
+            unit_propagations += cube_propagations
+            restarts += cube_restarts
+            if sat:
+                return True, model, len(cubes), time.time() - start_time, decisions, unit_propagations, restarts
+
+    return False, [], len(cubes), time.time() - start_time, decisions, unit_propagations, restarts
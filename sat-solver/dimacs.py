@@ -0,0 +1,162 @@
+import bz2
+import gzip
+import lzma
+import re
+import warnings
+from array import array
+import numpy as np
+from typing import BinaryIO, Iterator
+
+# first bytes of the compressed formats which can be read directly
+MAGIC_NUMBERS = {
+    b"\x1f\x8b": gzip.open,
+    b"BZh": bz2.open,
+    b"\xfd7zXZ\x00": lzma.open,
+}
+
+# lines which are not part of the clauses: comments, the problem line and the `%` end marker of SATLIB files
+SPECIAL_LINE = re.compile(rb"^[ \t]*([cp%])[^\n]*$", re.MULTILINE)
+
+
+class DimacsError(ValueError):
+    pass
+
+
+class DimacsFormula:
+    """
+    A parsed DIMACS CNF formula. The clauses are stored one after the other in a flat array of literals,
+    each clause is terminated by a 0.
+    """
+
+    def __init__(self, num_variables: int, num_clauses: int, literals: array):
+        self.num_variables = num_variables
+        self.num_clauses = num_clauses
+        self.literals = literals
+
+    def clauses(self) -> Iterator[list]:
+        """
+        Iterates over the clauses as lists of literals.
+        """
+        clause = []
+        for literal in self.literals:
+            if literal == 0:
+                yield clause
+                clause = []
+
+            else:
+                clause.append(literal)
+
+
+def open_dimacs(path: str) -> BinaryIO:
+    """
+    Opens the file for binary reading, gzip, bzip2 and xz compressed files are detected by their magic number.
+    """
+    with open(path, "rb") as file:
+        magic = file.read(6)
+
+    for magic_number, opener in MAGIC_NUMBERS.items():
+        if magic.startswith(magic_number):
+            return opener(path, "rb")
+
+    return open(path, "rb")
+
+
+def parse_header(line: bytes) -> tuple:
+    fields = line.split()
+    if len(fields) != 4 or fields[1] != b"cnf":
+        raise DimacsError("invalid problem line: {!r}".format(line.decode(errors="replace")))
+
+    try:
+        num_variables, num_clauses = int(fields[2]), int(fields[3])
+
+    except ValueError:
+        raise DimacsError("invalid problem line: {!r}".format(line.decode(errors="replace"))) from None
+
+    if num_variables < 0 or num_clauses < 0:
+        raise DimacsError("negative size in problem line: {!r}".format(line.decode(errors="replace")))
+
+    return num_variables, num_clauses
+
+
+def parse_literals(text: bytes, literals: array, header: tuple) -> None:
+    """
+    Appends the whitespace separated literals of the text to the array, the conversion is done by NumPy.
+    """
+    if not text.strip():
+        return
+
+    if header is None:
+        raise DimacsError("clauses found before the problem line")
+
+    # older NumPy versions only warn about unparsable data and return what was read up to it
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", DeprecationWarning)
+        try:
+            parsed = np.fromstring(text, dtype=np.int32, sep=" ")
+
+        except (ValueError, DeprecationWarning):
+            raise DimacsError("invalid literal in: {!r}".format(text[:80].decode(errors="replace"))) from None
+
+    literals.frombytes(parsed.tobytes())
+
+
+def read_dimacs(path: str, chunk_size: int = 1 << 20, strict: bool = True) -> DimacsFormula:
+    """
+    Reads a DIMACS CNF file chunk by chunk straight into a flat array of literals. Clauses may span several lines
+    and literals may be separated by any whitespace. Parsing stops at a `%` line, as found at the end of SATLIB
+    benchmarks. With `strict` set, the literals must fit the number of variables of the problem line and the
+    number of clauses must match it.
+    """
+    header = None
+    literals = array("i")
+    remainder = b""
+    finished = False
+
+    with open_dimacs(path) as stream:
+        while not finished:
+            chunk = stream.read(chunk_size)
+            if chunk:
+                # only complete lines are parsed, the last partial line is kept for the next chunk
+                block = remainder + chunk
+                cut = block.rfind(b"\n") + 1
+                block, remainder = block[:cut], block[cut:]
+
+            else:
+                block, remainder = remainder, b""
+                finished = True
+
+            position = 0
+            for match in SPECIAL_LINE.finditer(block):
+                parse_literals(block[position:match.start()], literals, header)
+                position = match.end()
+                kind = match.group(1)
+                if kind == b"p":
+                    if header is not None:
+                        raise DimacsError("more than one problem line")
+
+                    header = parse_header(match.group(0))
+
+                elif kind == b"%":
+                    finished = True
+                    break
+
+            else:
+                parse_literals(block[position:], literals, header)
+
+    if header is None:
+        raise DimacsError("missing problem line")
+
+    # tolerate a missing 0 after the last clause
+    if literals and literals[-1] != 0:
+        literals.append(0)
+
+    num_variables, num_clauses = header
+    if strict:
+        if literals and max(max(literals), -min(literals)) > num_variables:
+            raise DimacsError("literal out of range, the problem line declares {} variables".format(num_variables))
+
+        if literals.count(0) != num_clauses:
+            raise DimacsError("the problem line declares {} clauses but {} were found".format(
+                num_clauses, literals.count(0)))
+
+    return DimacsFormula(num_variables, num_clauses, literals)
@@ -0,0 +1,66 @@
+from typing import Callable, Iterable, Optional
+
+
+def equivalent_literals(literals: Iterable[int], implications: Callable[[int], Iterable[int]]) -> Optional[dict]:
+    """
+    Finds the classes of equivalent literals as the strongly connected components of the binary implication graph,
+    with an iterative version of Tarjan's algorithm. Every literal of a class is replaced by the literal of the
+    class with the smallest variable, so the class of the negated literals gets the negated representative.
+    :param literals: the nodes of the graph, both literals of every variable
+    :param implications: function which returns the literals implied by a literal through binary clauses
+    :return: dict with every literal of a class except its representative as key and the representative as value,
+    or None if a literal is equivalent to its negation, i.e. the formula is unsatisfiable
+    """
+    index = {}  # dict: order in which `key` literal was visited
+    low_link = {}  # dict: smallest index reachable from `key` literal within its component
+    stack = []
+    on_stack = set()
+    representatives = {}
+
+    for root in literals:
+        if root in index:
+            continue
+
+        index[root] = low_link[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(implications(root)))]
+        while work:
+            literal, successors = work[-1]
+            for successor in successors:
+                if successor not in index:
+                    index[successor] = low_link[successor] = len(index)
+                    stack.append(successor)
+                    on_stack.add(successor)
+                    work.append((successor, iter(implications(successor))))
+                    break
+
+                if successor in on_stack:
+                    low_link[literal] = min(low_link[literal], index[successor])
+
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low_link[parent] = min(low_link[parent], low_link[literal])
+
+                if low_link[literal] == index[literal]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == literal:
+                            break
+
+                    if len(component) > 1:
+                        members = set(component)
+                        if any(-member in members for member in component):
+                            return None
+
+                        representative = min(component, key=abs)
+                        for member in component:
+                            if member != representative:
+                                representatives[member] = representative
+
+    return representatives
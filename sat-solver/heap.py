@@ -0,0 +1,112 @@
+class VariableHeap:
+    """
+    Indexed binary max-heap of variables ordered by `activity[variable]`.
+    The position of every variable inside the heap is tracked so that it can be moved up
+    in O(log n) after its activity increases, or removed from the middle of the heap.
+    """
+
+    def __init__(self, activity, variables=()):
+        self.activity = activity  # indexable with `variable` as index and score as value
+        self.heap = []  # list of variables in heap order
+        self.indices = {}  # dict: position of `key` variable inside the heap
+
+        for variable in variables:
+            self.indices[variable] = len(self.heap)
+            self.heap.append(variable)
+
+        for index in reversed(range(len(self.heap) // 2)):
+            self.percolate_down(index)
+
+    def __len__(self) -> int:
+        return len(self.heap)
+
+    def insert(self, variable: int) -> None:
+        """
+        Inserts the variable if it is not already in the heap.
+        """
+        if variable in self.indices:
+            return
+
+        self.indices[variable] = len(self.heap)
+        self.heap.append(variable)
+        self.percolate_up(len(self.heap) - 1)
+
+    def remove_max(self) -> int:
+        """
+        Removes and returns the variable with the highest activity.
+        """
+        variable = self.heap[0]
+        last = self.heap.pop()
+        del self.indices[variable]
+
+        if self.heap:
+            self.heap[0] = last
+            self.indices[last] = 0
+            self.percolate_down(0)
+
+        return variable
+
+    def remove(self, variable: int) -> None:
+        """
+        Removes the variable if it is in the heap.
+        """
+        if variable not in self.indices:
+            return
+
+        index = self.indices.pop(variable)
+        last = self.heap.pop()
+        if index < len(self.heap):
+            self.heap[index] = last
+            self.indices[last] = index
+            self.percolate_up(index)
+            self.percolate_down(self.indices[last])
+
+    def increase(self, variable: int) -> None:
+        """
+        Restores the heap order after the activity of the variable was increased.
+        """
+        if variable in self.indices:
+            self.percolate_up(self.indices[variable])
+
+    def percolate_up(self, index: int) -> None:
+        heap = self.heap
+        activity = self.activity
+        variable = heap[index]
+        key = activity[variable]
+
+        while index > 0:
+            parent = (index - 1) >> 1
+            if activity[heap[parent]] >= key:
+                break
+
+            heap[index] = heap[parent]
+            self.indices[heap[index]] = index
+            index = parent
+
+        heap[index] = variable
+        self.indices[variable] = index
+
+    def percolate_down(self, index: int) -> None:
+        heap = self.heap
+        activity = self.activity
+        size = len(heap)
+        variable = heap[index]
+        key = activity[variable]
+
+        while True:
+            child = 2 * index + 1
+            if child >= size:
+                break
+
+            if child + 1 < size and activity[heap[child + 1]] > activity[heap[child]]:
+                child += 1
+
+            if activity[heap[child]] <= key:
+                break
+
+            heap[index] = heap[child]
+            self.indices[heap[index]] = index
+            index = child
+
+        heap[index] = variable
+        self.indices[variable] = index
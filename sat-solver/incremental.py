@@ -0,0 +1,82 @@
+from typing import Iterable, Optional, Tuple
+
+from cdcl import cdcl
+from cnf import CNF
+from restarts import make_restart_policy
+
+
+class IncrementalSolver:
+    """
+    Solver for a sequence of related queries: clauses can be added between two calls of `solve`, and each call may
+    assume some literals to be true for that call only. The learned clauses, activities and saved phases are kept
+    from one call to the next instead of rebuilding the solver. The interface follows the `Solver` of pycryptosat.
+    """
+
+    def __init__(self, heuristic: int = 1, minimization: int = 2, restart: str = "geometric",
+                 phase_saving: bool = True, rephase: str = "none", rephase_interval: int = 10):
+        self.cnf_formula = CNF([])
+        self.cnf_formula.clause_minimization = minimization
+        self.cnf_formula.phase_saving = phase_saving
+        self.heuristic = heuristic
+        self.restart = restart
+        self.rephase = rephase
+        self.rephase_interval = rephase_interval
+
+        # statistics summed over all the calls of `solve`
+        self.decisions = 0
+        self.unit_propagations = 0
+        self.restarts = 0
+
+    def nb_vars(self) -> int:
+        return len(self.cnf_formula.assignment) - 1
+
+    def nb_clauses(self) -> int:
+        return len(self.cnf_formula.clauses)
+
+    def add_clause(self, clause: Iterable[int]) -> None:
+        """
+        Adds a clause to the formula, it holds for all the following calls of `solve`.
+        """
+        clause = list(clause)
+        self.cnf_formula.backtrack(0)
+        self.cnf_formula.add_variables(max(map(abs, clause), default=0))
+        self.cnf_formula.add_root_clause(clause, learned=False)
+
+    def add_clauses(self, clauses: Iterable[Iterable[int]]) -> None:
+        for clause in clauses:
+            self.add_clause(clause)
+
+    def solve(self, assumptions: Iterable[int] = ()) -> Tuple[bool, Optional[tuple]]:
+        """
+        Solves the formula with the assumptions taken as true.
+        :return: whether it is satisfiable and if so, the model as a tuple with `variable` as index and its value as
+        boolean (index 0 is None), otherwise None. After an unsatisfiable call `get_conflict` tells which
+        assumptions are to blame.
+        """
+        assumptions = list(assumptions)
+        self.cnf_formula.add_variables(max(map(abs, assumptions), default=0))
+        sat, _, decisions, unit_propagations, restarts = cdcl(self.cnf_formula, self.heuristic,
+                                                             make_restart_policy(self.restart), self.rephase,
+                                                             self.rephase_interval, assumptions=assumptions)
+        self.decisions += decisions
+        self.unit_propagations += unit_propagations
+        self.restarts += restarts
+
+        if not sat:
+            return False, None
+
+        solution = [None] + [False] * self.nb_vars()
+        for literal in self.cnf_formula.model():
+            solution[abs(literal)] = literal > 0
+
+        return True, tuple(solution)
+
+    def is_satisfiable(self) -> bool:
+        return self.solve()[0]
+
+    def get_conflict(self) -> list:
+        """
+        :return: the assumptions which made the last call of `solve` unsatisfiable, empty if the formula is
+        unsatisfiable on its own
+        """
+        return list(self.cnf_formula.final_conflict)
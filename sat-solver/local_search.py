@@ -0,0 +1,218 @@
+import random
+from typing import Iterable, Optional, Sequence
+
+
+class LocalSearch:
+    """
+    Stochastic local search, which flips one variable of a complete assignment at a time until no clause is false.
+    It cannot prove unsatisfiability, so it gives up after a number of flips.
+
+    Every clause keeps the number of its true literals and the sum of their variables, so the only true variable of
+    a clause with a single true literal is known without scanning the clause. The break score of a variable is the
+    number of clauses which become false if it is flipped, its make score the number of false clauses which become
+    true. The counts and scores are updated on each flip from the occurrences of the flipped variable only. The false
+    clauses are kept in a list together with the position of every clause in it, so that a clause is added and
+    removed in O(1).
+    """
+
+    def __init__(self, clauses: Iterable[Iterable[int]], num_variables: int = 0, seed: Optional[int] = None,
+                 phases: Optional[Sequence[int]] = None):
+        self.random = random.Random(seed)
+        self.clauses = []  # list of clauses as lists of literals, without duplicate literals and tautologies
+        self.empty_clause = False  # the formula has an empty clause, no assignment satisfies it
+        for clause in clauses:
+            literals = []
+            for literal in clause:
+                if -literal in literals:
+                    break
+
+                if literal not in literals:
+                    literals.append(literal)
+                    num_variables = max(num_variables, abs(literal))
+
+            else:
+                if literals:
+                    self.clauses.append(literals)
+
+                else:
+                    self.empty_clause = True
+
+        self.num_variables = num_variables
+        self.occurrences = {}  # dict: list of indices of the clauses with `key` literal, for both polarities
+        for variable in range(1, num_variables + 1):
+            self.occurrences[variable] = []
+            self.occurrences[-variable] = []
+
+        for index, clause in enumerate(self.clauses):
+            for literal in clause:
+                self.occurrences[literal].append(index)
+
+        self.assignment = [0] * (num_variables + 1)  # list with `variable` as index and its true literal as value
+        self.true_count = [0] * len(self.clauses)  # number of true literals of the clause
+        self.true_sum = [0] * len(self.clauses)  # sum of the variables of the true literals of the clause
+        self.break_score = [0] * (num_variables + 1)
+        self.make_score = [0] * (num_variables + 1)
+        self.unsatisfied = []  # indices of the false clauses
+        self.position = [-1] * len(self.clauses)  # index of the clause in `unsatisfied`, or -1
+        self.flips = 0
+        self.best_assignment = None  # assignment with the fewest false clauses so far
+        self.best_unsatisfied = len(self.clauses) + 1
+        self.reset(phases)
+
+    def reset(self, phases: Optional[Sequence[int]] = None) -> None:
+        """
+        Starts from a new assignment: a variable takes its literal from `phases`, a list with `variable` as index and
+        a literal or 0 as value, or a random polarity if it has none. All the counts and scores are computed again.
+        """
+        for variable in range(1, self.num_variables + 1):
+            phase = phases[variable] if phases is not None and variable < len(phases) else 0
+            if phase == 0:
+                phase = variable if self.random.random() < 0.5 else -variable
+
+            self.assignment[variable] = phase
+
+        self.break_score = [0] * (self.num_variables + 1)
+        self.make_score = [0] * (self.num_variables + 1)
+        self.unsatisfied = []
+        self.position = [-1] * len(self.clauses)
+        for index, clause in enumerate(self.clauses):
+            true_variables = [abs(literal) for literal in clause if self.assignment[abs(literal)] == literal]
+            self.true_count[index] = len(true_variables)
+            self.true_sum[index] = sum(true_variables)
+            if not true_variables:
+                self.position[index] = len(self.unsatisfied)
+                self.unsatisfied.append(index)
+                for literal in clause:
+                    self.make_score[abs(literal)] += 1
+
+            elif len(true_variables) == 1:
+                self.break_score[true_variables[0]] += 1
+
+        self.best_assignment = list(self.assignment)
+        self.best_unsatisfied = len(self.unsatisfied)
+
+    def flip(self, variable: int) -> None:
+        """
+        Flips the variable and updates the clauses it occurs in.
+        """
+        assignment = self.assignment
+        true_count = self.true_count
+        true_sum = self.true_sum
+        break_score = self.break_score
+        make_score = self.make_score
+        unsatisfied = self.unsatisfied
+        position = self.position
+
+        true_literal = -assignment[variable]
+        assignment[variable] = true_literal
+
+        # the clauses of the literal which became true gain a true literal
+        for index in self.occurrences[true_literal]:
+            count = true_count[index]
+            if count == 0:
+                # swap the last false clause into the place of this one
+                last = unsatisfied.pop()
+                if last != index:
+                    unsatisfied[position[index]] = last
+                    position[last] = position[index]
+                position[index] = -1
+
+                for literal in self.clauses[index]:
+                    make_score[abs(literal)] -= 1
+                break_score[variable] += 1
+
+            elif count == 1:
+                break_score[true_sum[index]] -= 1
+
+            true_count[index] = count + 1
+            true_sum[index] += variable
+
+        # the clauses of the literal which became false lose one
+        for index in self.occurrences[-true_literal]:
+            count = true_count[index] - 1
+            true_count[index] = count
+            true_sum[index] -= variable
+            if count == 0:
+                position[index] = len(unsatisfied)
+                unsatisfied.append(index)
+                for literal in self.clauses[index]:
+                    make_score[abs(literal)] += 1
+                break_score[variable] -= 1
+
+            elif count == 1:
+                break_score[true_sum[index]] += 1
+
+        self.flips += 1
+        if len(unsatisfied) < self.best_unsatisfied:
+            self.best_unsatisfied = len(unsatisfied)
+            self.best_assignment = list(assignment)
+
+    def walksat(self, max_flips: int, noise: float = 0.567) -> bool:
+        """
+        WalkSAT: picks a random false clause and flips one of its variables, a variable which breaks no clause if
+        there is one, otherwise a random variable with probability `noise` and a variable with the lowest break score
+        with the remaining probability.
+        :return: whether a model was found within `max_flips` flips
+        """
+        if self.empty_clause:
+            return False
+
+        rng = self.random
+        break_score = self.break_score
+        unsatisfied = self.unsatisfied
+        flips_limit = self.flips + max_flips
+        while unsatisfied:
+            if self.flips >= flips_limit:
+                return False
+
+            clause = self.clauses[unsatisfied[rng.randrange(len(unsatisfied))]]
+            scores = [break_score[abs(literal)] for literal in clause]
+            lowest = min(scores)
+            if lowest > 0 and rng.random() < noise:
+                literal = rng.choice(clause)
+
+            else:
+                literal = rng.choice([literal for literal, score in zip(clause, scores) if score == lowest])
+
+            self.flip(abs(literal))
+
+        return True
+
+    def probsat(self, max_flips: int, cb: float = 2.06, eps: float = 0.9) -> bool:
+        """
+        ProbSAT: picks a random false clause and flips one of its variables at random, with a probability which
+        decreases polynomially with its break score, as (eps + break)^-cb. The defaults are tuned for 3-SAT.
+        :return: whether a model was found within `max_flips` flips
+        """
+        if self.empty_clause:
+            return False
+
+        # the weight of every possible break score, which is at most the number of occurrences of a literal
+        most_occurrences = max(map(len, self.occurrences.values()), default=0)
+        weights = [(eps + score) ** -cb for score in range(most_occurrences + 1)]
+
+        rng = self.random
+        break_score = self.break_score
+        unsatisfied = self.unsatisfied
+        flips_limit = self.flips + max_flips
+        while unsatisfied:
+            if self.flips >= flips_limit:
+                return False
+
+            clause = self.clauses[unsatisfied[rng.randrange(len(unsatisfied))]]
+            literal = rng.choices(clause, [weights[break_score[abs(literal)]] for literal in clause])[0]
+            self.flip(abs(literal))
+
+        return True
+
+    def model(self) -> list:
+        """
+        :return: the current assignment as a list of literals, a model once `walksat` or `probsat` succeeded
+        """
+        return self.assignment[1:]
+
+
+LOCAL_SEARCH_ALGORITHMS = {
+    "walksat": LocalSearch.walksat,
+    "probsat": LocalSearch.probsat,
+}
@@ -0,0 +1,99 @@
+import multiprocessing
+import queue
+import time
+from typing import Optional
+
+import cdcl
+from sharing import ClauseExchange
+
+# configurations tried by the portfolio, in the order in which they are started, the first one is the plain solver
+PORTFOLIO = [
+    {"heuristic": 1, "restart": "glucose"},
+    {"heuristic": 1, "restart": "luby", "seed": 1},
+    {"heuristic": 1, "restart": "geometric", "rephase": "best", "seed": 2},
+    {"heuristic": 4, "restart": "glucose", "seed": 3},
+    {"heuristic": 1, "restart": "glucose", "rephase": "inverted", "seed": 4},
+    {"heuristic": 1, "restart": "luby", "phase_saving": False, "seed": 5},
+    {"heuristic": 0, "restart": "luby", "seed": 6},
+    {"heuristic": 3, "restart": "luby", "seed": 7},
+]
+
+
+def portfolio_worker(input_file: str, index: int, config: dict, results: multiprocessing.Queue,
+                     inboxes: Optional[list] = None) -> None:
+    """
+    Solves the formula with one configuration of the portfolio and reports the result to the parent process.
+    With `inboxes`, learned clauses are exchanged with the other workers through their queues.
+    """
+    clause_exchange = None
+    if inboxes is not None:
+        clause_exchange = ClauseExchange(inboxes[index], [inbox for other, inbox in enumerate(inboxes) if other != index])
+
+    try:
+        _, sat, model, cpu_time, decisions, unit_propagations, restarts = cdcl.solve_file(
+            input_file, clause_exchange=clause_exchange, **config)
+        results.put((index, sat, model, cpu_time, decisions, unit_propagations, restarts))
+
+    except Exception as error:
+        results.put((index, error))
+
+
+def run_portfolio(input_file: str, jobs: Optional[int] = None, timeout: Optional[float] = None,
+                  configs: Optional[list] = None, share: bool = False, **options) -> Optional[tuple]:
+    """
+    Runs several configurations of `cdcl` on the same formula in parallel processes. The first answer wins and the
+    other processes are terminated. The `options` are shared by all the configurations, see `cdcl.solve_formula`.
+    With `share`, the processes exchange their short learned clauses, see `sharing.ClauseExchange`.
+    :return: tuple of the winning configuration, sat, model, wall-clock time, decisions, unit propagations and
+    restarts, or None if no configuration finished within the timeout
+    """
+    if configs is None:
+        configs = PORTFOLIO[:jobs or multiprocessing.cpu_count()]
+
+    configs = [dict(options, **config) for config in configs]
+    results = multiprocessing.Queue()
+    inboxes = [multiprocessing.Queue() for _ in configs] if share else None
+    workers = [multiprocessing.Process(target=portfolio_worker, args=(input_file, index, config, results, inboxes),
+                                       daemon=True)
+               for index, config in enumerate(configs)]
+
+    start_time = time.time()
+    for worker in workers:
+        worker.start()
+
+    answer = None
+    errors = []
+    try:
+        while answer is None and len(errors) < len(workers):
+            if timeout is not None and time.time() - start_time > timeout:
+                break
+
+            try:
+                result = results.get(timeout=0.1)
+
+            except queue.Empty:
+                # a worker killed by the operating system never reports back
+                if not any(worker.is_alive() for worker in workers) and results.empty():
+                    break
+
+                continue
+
+            if isinstance(result[1], Exception):
+                errors.append(result[1])
+
+            else:
+                index, sat, model, _, decisions, unit_propagations, restarts = result
+                answer = configs[index], sat, model, time.time() - start_time, decisions, unit_propagations, restarts
+
+    finally:
+        for worker in workers:
+            if worker.is_alive():
+                worker.terminate()
+
+        for worker in workers:
+            worker.join()
+
+    if answer is None and errors and len(errors) == len(workers):
+        raise errors[0]
+
+    return answer
@@ -0,0 +1,355 @@
+from typing import Iterable, Optional
+
+from equivalences import equivalent_literals
+
+
+class Preprocessor:
+    """
+    Simplifies a formula before the `CNF` is built. The passes are unit propagation, subsumption and self-subsuming
+    strengthening over occurrence lists, equivalent literal substitution, failed literal probing and bounded variable
+    elimination. The clauses removed by variable elimination and substitution are kept on a reconstruction stack,
+    from which `extend_model` turns a model of the simplified formula back into a model of the original one.
+    """
+
+    def __init__(self, clauses: Iterable[Iterable[int]], num_variables: int = 0, resolution_limit: int = 100,
+                 resolvent_size_limit: int = 20, probing_budget: int = 200000):
+        self.resolution_limit = resolution_limit  # variables with more pairs of clauses to resolve are kept
+        self.resolvent_size_limit = resolvent_size_limit  # variables with a longer resolvent are kept
+        self.probing_budget = probing_budget  # number of clause visits of failed literal probing
+
+        self.clauses = []  # list of clauses as lists of literals, None once deleted
+        self.occurrences = {}  # dict: set of indices of the clauses with `key` literal
+        self.assignment = [0]  # list with `variable` as index and its fixed literal (or 0) as value
+        self.units = []  # fixed literals which are not propagated yet
+        self.subsumption_queue = []  # indices of the clauses to check for subsumption of other clauses
+        self.reconstruction_stack = []  # stack of (literal, clause): the literal is set true if the clause is false
+        self.eliminated = set()  # eliminated and substituted variables
+        self.unsat = False
+
+        self.add_variables(num_variables)
+        for clause in clauses:
+            self.add_clause(clause)
+
+    def add_variables(self, max_variable: int) -> None:
+        for variable in range(len(self.assignment), max_variable + 1):
+            self.assignment.append(0)
+            self.occurrences[variable] = set()
+            self.occurrences[-variable] = set()
+
+    def add_clause(self, literals: Iterable[int]) -> None:
+        """
+        Adds a clause without its duplicate and fixed false literals, tautologies and satisfied clauses are skipped.
+        """
+        clause = []
+        for literal in literals:
+            self.add_variables(abs(literal))
+            value = self.assignment[abs(literal)]
+            if value == literal or -literal in clause:
+                return
+
+            if value == 0 and literal not in clause:
+                clause.append(literal)
+
+        if len(clause) < 2:
+            if clause:
+                self.assign(clause[0])
+
+            else:
+                self.unsat = True
+
+            return
+
+        index = len(self.clauses)
+        self.clauses.append(clause)
+        for literal in clause:
+            self.occurrences[literal].add(index)
+
+        self.subsumption_queue.append(index)
+
+    def delete_clause(self, index: int) -> None:
+        for literal in self.clauses[index]:
+            self.occurrences[literal].discard(index)
+
+        self.clauses[index] = None
+
+    def strengthen(self, index: int, literal: int) -> None:
+        """
+        Removes the literal from the clause, a clause left with a single literal is replaced by its assignment.
+        """
+        clause = self.clauses[index]
+        clause.remove(literal)
+        self.occurrences[literal].discard(index)
+        if len(clause) == 1:
+            self.delete_clause(index)
+            self.assign(clause[0])
+
+        else:
+            self.subsumption_queue.append(index)
+
+    def assign(self, literal: int) -> None:
+        value = self.assignment[abs(literal)]
+        if value == -literal:
+            self.unsat = True
+
+        elif value == 0:
+            self.assignment[abs(literal)] = literal
+            self.units.append(literal)
+
+    def propagate(self) -> None:
+        """
+        Unit propagation: the clauses satisfied by a fixed literal are deleted and its negation is removed from the
+        other ones.
+        """
+        while self.units and not self.unsat:
+            literal = self.units.pop()
+            for index in list(self.occurrences[literal]):
+                self.delete_clause(index)
+
+            for index in list(self.occurrences[-literal]):
+                self.strengthen(index, -literal)
+
+    @staticmethod
+    def subsumption_check(clause: set, other: list) -> Optional[int]:
+        """
+        :return: 0 if the clause subsumes the other one, a literal of the other clause if the clause subsumes it
+        after resolving on that literal (self-subsuming resolution), otherwise None
+        """
+        other = set(other)
+        removable = 0
+        for literal in clause:
+            if literal in other:
+                continue
+
+            if -literal in other and removable == 0:
+                removable = -literal
+                continue
+
+            return None
+
+        return removable
+
+    def subsume(self) -> None:
+        """
+        Backward subsumption: every clause of the queue deletes the clauses it subsumes and strengthens the ones it
+        subsumes after resolution. Only the clauses containing the variable of the clause with the fewest occurrences
+        are candidates, as both kinds of clauses must contain it.
+        """
+        while self.subsumption_queue and not self.unsat:
+            index = self.subsumption_queue.pop()
+            clause = self.clauses[index]
+            if clause is None:
+                continue
+
+            clause_set = set(clause)
+            pivot = min(clause, key=lambda literal: len(self.occurrences[literal]) + len(self.occurrences[-literal]))
+            for other_index in list(self.occurrences[pivot] | self.occurrences[-pivot]):
+                other = self.clauses[other_index]
+                if other_index == index or other is None or len(other) < len(clause_set):
+                    continue
+
+                removable = self.subsumption_check(clause_set, other)
+                if removable == 0:
+                    self.delete_clause(other_index)
+
+                elif removable is not None:
+                    self.strengthen(other_index, removable)
+
+            self.propagate()
+
+    def probe(self, literal: int, budget: list) -> bool:
+        """
+        Propagates the literal on its own, without changing the formula. The number of visited clauses is taken from
+        the budget.
+        :return: whether the literal failed, i.e. led to a conflict
+        """
+        values = {abs(literal): literal}
+        queue = [literal]
+        for propagated in queue:
+            for index in self.occurrences[-propagated]:
+                budget[0] -= 1
+                unassigned = 0
+                count = 0
+                for other in self.clauses[index]:
+                    value = values.get(abs(other), 0)
+                    if value == other:
+                        break
+
+                    if value == 0:
+                        unassigned = other
+                        count += 1
+
+                else:
+                    if count == 0:
+                        return True
+
+                    if count == 1:
+                        values[abs(unassigned)] = unassigned
+                        queue.append(unassigned)
+
+        return False
+
+    def probe_failed_literals(self) -> None:
+        """
+        Failed literal probing: a literal whose propagation leads to a conflict is fixed to false. Only the literals
+        whose negation occurs in a binary clause imply something and are probed.
+        """
+        budget = [self.probing_budget]
+        for variable in range(1, len(self.assignment)):
+            for literal in (variable, -variable):
+                if budget[0] <= 0 or self.unsat:
+                    return
+
+                if self.assignment[variable] != 0 or variable in self.eliminated:
+                    continue
+
+                if any(len(self.clauses[index]) == 2 for index in self.occurrences[-literal]):
+                    if self.probe(literal, budget):
+                        self.assign(-literal)
+                        self.propagate()
+                        self.subsume()
+
+    def substitute_equivalences(self) -> None:
+        """
+        Equivalent literal substitution: the literals of every strongly connected component of the binary implication
+        graph are replaced by its representative. A substituted variable goes on the reconstruction stack with the
+        two binary clauses of its equivalence, which give it the value of its representative.
+        """
+        def implications(literal):
+            return [other for index in self.occurrences[-literal] if len(self.clauses[index]) == 2
+                    for other in self.clauses[index] if other != -literal]
+
+        literals = [literal for variable in range(1, len(self.assignment))
+                    if self.assignment[variable] == 0 and variable not in self.eliminated
+                    for literal in (variable, -variable)]
+        representatives = equivalent_literals(literals, implications)
+        if representatives is None:
+            self.unsat = True
+            return
+
+        for literal, representative in representatives.items():
+            if literal > 0:
+                self.reconstruction_stack.append((literal, [literal, -representative]))
+                self.reconstruction_stack.append((-literal, [-literal, representative]))
+                self.eliminated.add(literal)
+
+        for index, clause in enumerate(self.clauses):
+            if clause is not None and any(literal in representatives for literal in clause):
+                self.delete_clause(index)
+                self.add_clause([representatives.get(literal, literal) for literal in clause])
+
+        self.propagate()
+        self.subsume()
+
+    def eliminate_variables(self) -> None:
+        """
+        Bounded variable elimination: a variable is replaced by all the non-tautological resolvents of its positive
+        and negative clauses if there are no more of them than the clauses they replace.
+        """
+        variables = [variable for variable in range(1, len(self.assignment)) if self.assignment[variable] == 0]
+        variables.sort(key=lambda variable: len(self.occurrences[variable]) * len(self.occurrences[-variable]))
+        for variable in variables:
+            if self.unsat:
+                return
+
+            positive = list(self.occurrences[variable])
+            negative = list(self.occurrences[-variable])
+            if self.assignment[variable] != 0 or not positive and not negative:
+                continue
+
+            if len(positive) * len(negative) > self.resolution_limit:
+                continue
+
+            resolvents = self.resolvents(variable, positive, negative)
+            if resolvents is None or len(resolvents) > len(positive) + len(negative):
+                continue
+
+            for index in positive:
+                self.reconstruction_stack.append((variable, self.clauses[index]))
+                self.delete_clause(index)
+
+            for index in negative:
+                self.reconstruction_stack.append((-variable, self.clauses[index]))
+                self.delete_clause(index)
+
+            self.eliminated.add(variable)
+            for resolvent in resolvents:
+                self.add_clause(resolvent)
+
+            self.propagate()
+            self.subsume()
+
+    def resolvents(self, variable: int, positive: list, negative: list) -> Optional[list]:
+        """
+        :return: the non-tautological resolvents on the variable of the positive and negative clauses, or None as
+        soon as one of them is longer than `resolvent_size_limit`
+        """
+        resolvents = []
+        for positive_index in positive:
+            for negative_index in negative:
+                resolvent = self.resolve(self.clauses[positive_index], self.clauses[negative_index], variable)
+                if resolvent is None:
+                    continue
+
+                if len(resolvent) > self.resolvent_size_limit:
+                    return None
+
+                resolvents.append(resolvent)
+
+        return resolvents
+
+    @staticmethod
+    def resolve(clause: list, other: list, variable: int) -> Optional[list]:
+        """
+        :return: the resolvent of the two clauses on the variable, or None if it is a tautology
+        """
+        resolvent = [literal for literal in clause if literal != variable]
+        for literal in other:
+            if literal == -variable or literal in resolvent:
+                continue
+
+            if -literal in resolvent:
+                return None
+
+            resolvent.append(literal)
+
+        return resolvent
+
+    def run(self) -> list:
+        """
+        Runs all the passes.
+        :return: the simplified clauses, a single empty clause if the formula is unsatisfiable
+        """
+        self.propagate()
+        self.subsume()
+        self.substitute_equivalences()
+        self.probe_failed_literals()
+        self.eliminate_variables()
+        # probing and elimination may have created new binary clauses
+        if not self.unsat:
+            self.substitute_equivalences()
+
+        if self.unsat:
+            return [[]]
+
+        return [list(clause) for clause in self.clauses if clause is not None]
+
+    def extend_model(self, model: Iterable[int]) -> list:
+        """
+        Turns a model of the simplified formula into a model of the original one: the fixed literals are added and
+        the eliminated variables are set, in the reverse order of their elimination, so that their clauses hold.
+        :return: the model as a list with one literal per variable
+        """
+        assignment = list(self.assignment)
+        for literal in model:
+            if assignment[abs(literal)] == 0:
+                assignment[abs(literal)] = literal
+
+        for variable in range(1, len(assignment)):
+            if assignment[variable] == 0:
+                assignment[variable] = -variable
+
+        for literal, clause in reversed(self.reconstruction_stack):
+            if not any(assignment[abs(other)] == other for other in clause):
+                assignment[abs(literal)] = literal
+
+        return assignment[1:]
@@ -0,0 +1,118 @@
+class RestartPolicy:
+    """
+    Decides when `cdcl` restarts. The solver reports every conflict with the LBD of the clause it learned,
+    asks `should_restart` afterwards and calls `on_restart` when it actually restarts.
+    """
+
+    def __init__(self):
+        self.conflicts = 0  # conflicts since the last restart
+
+    def on_conflict(self, lbd: int) -> None:
+        self.conflicts += 1
+
+    def should_restart(self) -> bool:
+        raise NotImplementedError
+
+    def on_restart(self) -> None:
+        self.conflicts = 0
+
+
+class GeometricRestart(RestartPolicy):
+    """
+    Restarts after `conflicts_limit` conflicts, the limit grows by `factor` on every restart.
+    """
+
+    def __init__(self, conflicts_limit: int = 1000, factor: float = 1.1):
+        super().__init__()
+        self.conflicts_limit = conflicts_limit
+        self.factor = factor
+
+    def should_restart(self) -> bool:
+        return self.conflicts >= self.conflicts_limit
+
+    def on_restart(self) -> None:
+        super().on_restart()
+        self.conflicts_limit = int(self.conflicts_limit * self.factor)
+
+
+class LubyRestart(RestartPolicy):
+    """
+    Restarts after `unit` times the next element of the Luby sequence 1, 1, 2, 1, 1, 2, 4, 1, ... conflicts.
+    """
+
+    def __init__(self, unit: int = 100):
+        super().__init__()
+        self.unit = unit
+        self.index = 0
+        self.conflicts_limit = unit * self.luby(self.index)
+
+    @staticmethod
+    def luby(index: int) -> int:
+        """
+        Returns the element of the Luby sequence at the given (0-based) index.
+        """
+        # find the finite subsequence that contains the index and its size
+        size = 1
+        sequence = 0
+        while size < index + 1:
+            sequence += 1
+            size = 2 * size + 1
+
+        while size - 1 != index:
+            size = (size - 1) >> 1
+            sequence -= 1
+            index = index % size
+
+        return 1 << sequence
+
+    def should_restart(self) -> bool:
+        return self.conflicts >= self.conflicts_limit
+
+    def on_restart(self) -> None:
+        super().on_restart()
+        self.index += 1
+        self.conflicts_limit = self.unit * self.luby(self.index)
+
+
+class GlucoseRestart(RestartPolicy):
+    """
+    Restarts when the recent learned clauses are worse than usual, i.e. when the fast exponential moving average of
+    their LBD exceeds the slow one scaled by `margin`. At least `minimum_conflicts` conflicts happen between restarts.
+    """
+
+    def __init__(self, fast_alpha: float = 1 / 32, slow_alpha: float = 1 / 4096, margin: float = 1.25,
+                 minimum_conflicts: int = 50):
+        super().__init__()
+        self.fast_alpha = fast_alpha
+        self.slow_alpha = slow_alpha
+        self.margin = margin
+        self.minimum_conflicts = minimum_conflicts
+        self.fast_average = 0.0
+        self.slow_average = 0.0
+        self.total_conflicts = 0
+
+    def on_conflict(self, lbd: int) -> None:
+        super().on_conflict(lbd)
+        self.total_conflicts += 1
+
+        # plain running mean until enough conflicts were seen, so that the averages are not biased towards 0
+        self.fast_average += max(self.fast_alpha, 1 / self.total_conflicts) * (lbd - self.fast_average)
+        self.slow_average += max(self.slow_alpha, 1 / self.total_conflicts) * (lbd - self.slow_average)
+
+    def should_restart(self) -> bool:
+        return (self.conflicts >= self.minimum_conflicts and
+                self.fast_average > self.margin * self.slow_average)
+
+
+RESTART_POLICIES = {
+    "geometric": GeometricRestart,
+    "luby": LubyRestart,
+    "glucose": GlucoseRestart,
+}
+
+
+def make_restart_policy(name: str) -> RestartPolicy:
+    """
+    Creates the restart policy with the given name and its default parameters.
+    """
+    return RESTART_POLICIES[name]()
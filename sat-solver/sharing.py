@@ -0,0 +1,62 @@
+import queue
+from multiprocessing import Queue
+
+from cnf import CNF
+
+
+class ClauseExchange:
+    """
+    Shares short learned clauses between the solvers of a portfolio. Every solver owns an inbox queue and knows the
+    inboxes of the others. Learned clauses with an LBD of at most `max_lbd` and at most `max_size` literals are
+    buffered by `export` and broadcast by `synchronize`, which the solver calls at every restart. At most
+    `export_limit` clauses are sent and `import_limit` clauses are added per restart, the rest waits in the queues.
+    """
+
+    def __init__(self, inbox: Queue, outboxes: list, max_lbd: int = 2, max_size: int = 8, export_limit: int = 100,
+                 import_limit: int = 500):
+        self.inbox = inbox
+        self.outboxes = outboxes
+        self.max_lbd = max_lbd
+        self.max_size = max_size
+        self.export_limit = export_limit
+        self.import_limit = import_limit
+        self.pending = []  # clauses to send at the next restart
+        self.received = []  # clauses taken from the inbox but not imported yet
+        self.exported = 0
+        self.imported = 0
+
+        # the queues may still hold clauses when the solver finishes, which must not keep the process alive
+        for outbox in outboxes:
+            outbox.cancel_join_thread()
+
+    def export(self, literals, lbd: int) -> None:
+        """
+        Buffers the learned clause if it is good enough and the export limit is not reached yet.
+        """
+        if lbd <= self.max_lbd and len(literals) <= self.max_size and len(self.pending) < self.export_limit:
+            self.pending.append(tuple(literals))
+
+    def synchronize(self, cnf_formula: CNF) -> None:
+        """
+        Sends the buffered clauses to the other solvers and adds the received ones to the learned clauses. The solver
+        must be at decision level 0.
+        """
+        if self.pending:
+            for outbox in self.outboxes:
+                outbox.put(self.pending)
+
+            self.exported += len(self.pending)
+            self.pending = []
+
+        while len(self.received) < self.import_limit:
+            try:
+                self.received.extend(self.inbox.get_nowait())
+
+            except queue.Empty:
+                break
+
+        for literals in self.received[:self.import_limit]:
+            cnf_formula.add_root_clause(literals, learned=True, lbd=len(literals))
+
+        self.imported += min(len(self.received), self.import_limit)
+        del self.received[:self.import_limit]
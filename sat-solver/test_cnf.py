@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+
+from cdcl import solve_formula
+from cnf import CNF
+
+
+def test_cnf_from_clause_array():
+    # (m, k) array of clauses, the layout of `random_formulas` in the k-cnf scripts
+    formula = np.array([[1, 2], [-1, 2], [1, -2]], dtype=np.int32)
+    sat, model, *_ = solve_formula(CNF(formula))
+    assert sat
+    assert sorted(model) == [1, 2]
+
+    sat, *_ = solve_formula(CNF(np.vstack((formula, [[-1, -2]]))))
+    assert not sat
+
+
+def test_cnf_from_zero_terminated_array():
+    formula = np.array([1, 2, 0, -1, 0], dtype=np.int32)
+    sat, model, *_ = solve_formula(CNF(formula))
+    assert sat
+    assert sorted(model, key=abs) == [-1, 2]
+
+
+def test_cnf_rejects_array_without_terminator():
+    with pytest.raises(ValueError):
+        CNF(np.array([1, 2, 0, -1], dtype=np.int32))
+
+    with pytest.raises(ValueError):
+        CNF(np.zeros((2, 3, 3), dtype=np.int32))